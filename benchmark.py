@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+"""
+Stress benchmark for the collision and NPC update path.
+
+Builds a level from a real TMX map without a window, fills it with N
+wandering Persons and times CollisionHandler.update plus sprites.update
+for a fixed number of frames.  The maps are small, so the map's blockers
+are repeated into a larger grid until every Person has room to wander.
+
+    python benchmark.py --save baseline.json
+    python benchmark.py --compare baseline.json
+
+With --compare the run exits nonzero if any population got slower, or
+allocates more per frame, than the baseline allows.
+"""
+from __future__ import print_function, division
+import os, sys, gc, json, math, random, argparse, timeit
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame as pg
+
+#The dummy video driver defaults to an 8 bit screen, which can't hold
+#the converted graphics setup loads.
+pg.init()
+pg.display.set_mode((800, 608), 0, 32)
+
+from data import tools, collision, triggers, clock, mapcache
+from data import constants as c
+from data.components import person
+from data.states import levels
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+#Python 2/3 compatibility.
+if sys.version_info[0] == 2:
+    range = xrange
+
+
+COUNTS = [10, 50, 100, 500, 1000, 2000, 5000]
+SHEETS = ['oldman', 'femalevillager', 'femvillager2', 'devil', 'soldier']
+FRAME_TIME = 16
+#Share of walkable tiles given a Person, so there is room to wander.
+DENSITY = .25
+
+
+class World(object):
+    """
+    A level's player, grid and collision handler filled with
+    synthetic wandering Persons.
+    """
+    def __init__(self, map_name, count, seed):
+        random.seed(seed)
+        self.level = levels.LevelState(map_name)
+        self.level.renderer = mapcache.CACHE.get_renderer(self.level.tmx_map)
+        self.level.game_data = tools.create_game_data_dict()
+        self.grid = self.make_grid(count)
+        self.player = person.Player('down', self.level.game_data)
+        self.sprites = pg.sprite.Group()
+        self.place_sprites(count)
+        self.collision_handler = collision.CollisionHandler(self.player,
+                                                            self.grid,
+                                                            self.sprites,
+                                                            triggers.TriggerMap(),
+                                                            self.level)
+        self.keys = pg.key.get_pressed()
+        self.current_time = 0
+
+    def make_grid(self, count):
+        """
+        Repeat the map's blockers in a square of copies large enough
+        for count Persons.
+        """
+        tmx_data = self.level.renderer.tmx_data
+        width = tmx_data.width
+        height = tmx_data.height
+        blockers = self.level.make_blockers()
+        walkable = (collision.TileGrid(width, height, blockers).blocked == 0).sum()
+
+        copies = int(math.ceil(math.sqrt((count + 1) / (walkable * DENSITY))))
+        grid = collision.TileGrid(width * copies, height * copies, [])
+
+        for column in range(copies):
+            for row in range(copies):
+                for blocker in blockers:
+                    grid.block_rect(blocker.move(column * width * 32,
+                                                 row * height * 32))
+
+        return grid
+
+    def place_sprites(self, count):
+        """
+        Put the player and count Persons on random walkable tiles.
+        """
+        tiles = [(x, y) for x in range(self.grid.width)
+                 for y in range(self.grid.height)
+                 if not self.grid.is_blocked(x, y)]
+        tiles = random.sample(tiles, count + 1)
+
+        self.player.rect.topleft = tiles[0][0] * 32, tiles[0][1] * 32
+        for x, y in tiles[1:]:
+            sprite = person.Person(random.choice(SHEETS), x * 32, y * 32,
+                                   'down', 'autoresting')
+            sprite.move_timer = random.randint(0, 2000)
+            self.sprites.add(sprite)
+
+    def update(self):
+        """
+        Advance one frame.
+        """
+        self.current_time += FRAME_TIME
+        clock.CLOCK.update(self.current_time)
+        self.sprites.update(self.current_time)
+        self.collision_handler.update(self.keys, self.current_time)
+
+
+def time_frames(world, frames):
+    """
+    Return the time, in milliseconds, of each frame.
+    """
+    timer = timeit.default_timer
+    times = []
+
+    for frame in range(frames):
+        start = timer()
+        world.update()
+        times.append((timer() - start) * 1000)
+
+    return times
+
+
+def count_allocations(world, frames):
+    """
+    Return the net memory blocks (tracemalloc) or garbage collected
+    objects (gc fallback) left allocated per frame.
+    """
+    if tracemalloc:
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        for frame in range(frames):
+            world.update()
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+        return blocks / frames
+
+    gc.collect()
+    gc.disable()
+    try:
+        before = len(gc.get_objects())
+        for frame in range(frames):
+            world.update()
+        after = len(gc.get_objects())
+    finally:
+        gc.enable()
+
+    return (after - before) / frames
+
+
+def run(map_name, counts, frames, seed):
+    """
+    Benchmark each population and return a dictionary of results
+    keyed by population.
+    """
+    results = {}
+
+    for count in counts:
+        world = World(map_name, count, seed)
+        time_frames(world, frames // 10)
+        times = sorted(time_frames(world, frames))
+        allocations = count_allocations(world, frames)
+        results[str(count)] = {'ms': sum(times) / len(times),
+                               'p95': times[int(len(times) * .95)],
+                               'allocs': allocations,
+                               'grid': [world.grid.width, world.grid.height]}
+        print('{0:>7} {1:>10.3f} {2:>10.3f} {3:>14.2f} {4:>10}'.format(
+            count, results[str(count)]['ms'], results[str(count)]['p95'],
+            allocations, '{0}x{1}'.format(*results[str(count)]['grid'])))
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Check results against a baseline.  Return a list of failures.
+    """
+    failures = []
+
+    for count, base in sorted(baseline['results'].items(), key=lambda i: int(i[0])):
+        if count not in results:
+            continue
+        result = results[count]
+        if result['ms'] > base['ms'] * (1 + tolerance):
+            failures.append('{0} sprites: {1:.3f} ms/frame, baseline {2:.3f}'.format(
+                count, result['ms'], base['ms']))
+        if result['allocs'] > base['allocs'] + max(1, abs(base['allocs']) * tolerance):
+            failures.append('{0} sprites: {1:.2f} allocations/frame, baseline {2:.2f}'.format(
+                count, result['allocs'], base['allocs']))
+
+    return failures
+
+
+def make_parser():
+    """
+    Make the command line parser.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--map', default=c.TOWN,
+                        help='TMX map to build the level from')
+    parser.add_argument('--counts', default=','.join(str(n) for n in COUNTS),
+                        help='comma separated sprite populations')
+    parser.add_argument('--frames', type=int, default=300,
+                        help='frames timed per population')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', metavar='FILE',
+                        help='write the results as a baseline')
+    parser.add_argument('--compare', metavar='FILE',
+                        help='fail if results regress against a baseline')
+    parser.add_argument('--tolerance', type=float, default=.25,
+                        help='allowed slowdown as a fraction of the baseline')
+
+    return parser
+
+
+def main():
+    args = make_parser().parse_args()
+    counts = [int(count) for count in args.counts.split(',')]
+
+    print('map: {0}  frames: {1}  allocations: {2}'.format(
+        args.map, args.frames, 'tracemalloc blocks' if tracemalloc else 'gc objects'))
+    print('{0:>7} {1:>10} {2:>10} {3:>14} {4:>10}'.format(
+        'sprites', 'ms/frame', 'p95 ms', 'allocs/frame', 'grid'))
+    results = run(args.map, counts, args.frames, args.seed)
+
+    if args.save:
+        with open(args.save, 'w') as baseline_file:
+            json.dump({'map': args.map, 'frames': args.frames,
+                       'results': results}, baseline_file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        failures = compare(results, baseline, args.tolerance)
+        for failure in failures:
+            print('REGRESSION: ' + failure)
+        if failures:
+            return 1
+        print('No regressions against ' + args.compare)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
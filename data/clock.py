@@ -0,0 +1,69 @@
+"""
+Global animation clock.  Sprites read their frame index from a
+shared, named timeline instead of keeping their own timers, so the
+cost of animating is per timeline rather than per sprite and every
+sprite on the same timeline animates in sync.
+"""
+from . import constants as c
+
+
+class Timeline(object):
+    """
+    A named timeline that ticks once every 'frequency' milliseconds.
+    """
+    def __init__(self, name, frequency):
+        self.name = name
+        self.frequency = frequency
+        self.tick = 0
+
+    def update(self, current_time):
+        """
+        Advance the timeline to the current time.
+        """
+        self.tick = int(current_time // self.frequency)
+
+    def get_frame(self, frame_count):
+        """
+        Return the frame index for an animation with frame_count frames.
+        """
+        return self.tick % frame_count
+
+
+class AnimationClock(object):
+    """
+    Advances every timeline once per frame.
+    """
+    def __init__(self):
+        self.current_time = 0.0
+        self.timeline_dict = self.make_timeline_dict()
+
+    def make_timeline_dict(self):
+        """
+        Make a dictionary of timelines keyed by name.
+        """
+        frequency_dict = {c.WALK_TIMELINE: 100,
+                          c.IDLE_TIMELINE: 500,
+                          c.SWORD_TIMELINE: 60}
+
+        timeline_dict = {}
+        for name, frequency in frequency_dict.items():
+            timeline_dict[name] = Timeline(name, frequency)
+
+        return timeline_dict
+
+    def update(self, current_time):
+        """
+        Advance all timelines.  Called once per frame by tools.Control.
+        """
+        self.current_time = current_time
+        for timeline in self.timeline_dict.values():
+            timeline.update(current_time)
+
+    def get_frame(self, name, frame_count):
+        """
+        Return the current frame index of a timeline.
+        """
+        return self.timeline_dict[name].get_frame(frame_count)
+
+
+CLOCK = AnimationClock()
@@ -1,115 +1,278 @@
 import random
-import pygame as pg
+import numpy as np
 from . import constants as c
 
+
+class TileGrid(object):
+    """
+    Walkability of every tile in a level, built once from the level's
+    blocker rects so that wall checks are a single array lookup.
+    version goes up whenever a tile is blocked, so anything cached
+    from the grid can tell when it is stale.
+    """
+    def __init__(self, width, height, blockers):
+        self.width = width
+        self.height = height
+        self.version = 0
+        self.blocked = np.zeros((width, height), np.uint8)
+        for blocker in blockers:
+            self.block_rect(blocker)
+
+    def block_rect(self, rect):
+        """
+        Mark every tile covered by a pixel rect as blocked.
+        """
+        left = max(rect.left // 32, 0)
+        top = max(rect.top // 32, 0)
+        right = min((rect.right + 31) // 32, self.width)
+        bottom = min((rect.bottom + 31) // 32, self.height)
+        if left < right and top < bottom:
+            self.blocked[left:right, top:bottom] = 1
+            self.version += 1
+
+    def set_area(self, left, top, blocked):
+        """
+        Copy an array of blocked tiles into the grid with its top left
+        at tile (left, top).
+        """
+        width, height = blocked.shape
+        self.blocked[left:left + width, top:top + height] = blocked
+        self.version += 1
+
+    def is_blocked(self, tile_x, tile_y):
+        """
+        Return True if a tile can not be walked on.  Tiles off the
+        map are always blocked.
+        """
+        if 0 <= tile_x < self.width and 0 <= tile_y < self.height:
+            return bool(self.blocked[tile_x, tile_y])
+        return True
+
+
+class Occupancy(object):
+    """
+    Tiles claimed by the player and level sprites.  A sprite claims the
+    tile it steps into and releases the tile it left when it arrives,
+    so while moving it holds both.
+    """
+    def __init__(self):
+        self.tile_dict = {}
+
+    def claim(self, sprite, tile):
+        """
+        Claim a tile for a sprite.
+        """
+        self.tile_dict[tile] = sprite
+
+    def release(self, sprite, tile):
+        """
+        Release a tile if it is held by sprite.
+        """
+        if self.tile_dict.get(tile) is sprite:
+            del self.tile_dict[tile]
+
+    def get_occupant(self, tile):
+        """
+        Return the sprite holding a tile, or None.
+        """
+        return self.tile_dict.get(tile)
+
+    def is_free(self, tile, sprite=None):
+        """
+        Return True if a tile is unclaimed or already held by sprite.
+        """
+        occupant = self.tile_dict.get(tile)
+        return occupant is None or occupant is sprite
+
+
 class CollisionHandler(object):
     """Handles collisions between the user, blockers and computer
-    characters"""
-    def __init__(self, player, blockers, sprites, portals, level):
+    characters.  Moving sprites step from tile to tile at their own
+    speed.  Steps are timed from when they start, so however much time
+    passes between updates, every tile crossed is entered in order and
+    the player's triggers are checked on each one.
+    """
+    def __init__(self, player, grid, sprites, trigger_map, level,
+                 draw_list=None):
         self.player = player
-        self.static_blockers = blockers
-        self.blockers = self.make_blocker_list(blockers, sprites)
+        self.grid = grid
+        self.occupancy = Occupancy()
         self.sprites = sprites
-        self.portals = portals
+        self.trigger_map = trigger_map
         self.level = level
+        self.draw_list = draw_list
+        self.step_dict = {}
+        self.claim_start_tiles()
 
-    def make_blocker_list(self, blockers, sprites):
+    def claim_start_tiles(self):
         """
-        Return a combined list of sprite blockers and object blockers.
+        Claim the tile every sprite starts on.
         """
-        blocker_list = []
-
-        for blocker in blockers:
-            blocker_list.append(blocker)
-
-        for sprite in sprites:
-            blocker_list.extend(sprite.blockers)
+        self.occupancy.claim(self.player, self.get_tile(self.player))
+        for sprite in self.sprites:
+            self.occupancy.claim(sprite, self.get_tile(sprite))
 
-        return blocker_list
+    def get_tile(self, sprite):
+        """
+        Return the tile the top left of a sprite is on.
+        """
+        return sprite.rect.x // 32, sprite.rect.y // 32
 
     def update(self, keys, current_time):
         """
-        Check for collisions between game objects.
+        Move the player and any automoving sprites up to current_time.
         """
-        self.blockers = self.make_blocker_list(self.static_blockers,
-                                               self.sprites)
-        self.player.rect.move_ip(self.player.x_vel, self.player.y_vel)
-        self.check_for_blockers()
+        if self.player.state == 'moving':
+            self.move_sprite(self.player, current_time, keys)
 
         for sprite in self.sprites:
-            sprite.rect.move_ip(sprite.x_vel, sprite.y_vel)
-        self.check_for_blockers()
+            if sprite.state == 'automoving':
+                self.move_sprite(sprite, current_time)
 
-        if self.player.rect.x % 32 == 0 and self.player.rect.y % 32 == 0:
-            if not self.player.state == 'resting':
-                self.check_for_portal()
-                self.check_for_battle()
-            self.player.begin_resting()
+    def move_sprite(self, sprite, current_time, keys=None):
+        """
+        Advance a sprite along its steps.  A step that completes before
+        current_time enters its tile, then the next step, if any, starts
+        at the exact time the last one ended.
+        """
+        while True:
+            if sprite not in self.step_dict:
+                if not self.start_step(sprite, sprite.move_timer):
+                    self.stop_sprite(sprite)
+                    return
 
-        for sprite in self.sprites:
-            if sprite.state == 'automoving':
-                if sprite.rect.x % 32 == 0 and sprite.rect.y % 32 == 0:
-                    sprite.begin_auto_resting()
+            origin, target, start_time = self.step_dict[sprite]
+            duration = 32 * 1000.0 / sprite.speed
+            elapsed = current_time - start_time
+
+            if elapsed < duration:
+                self.place_sprite(sprite, origin, target, elapsed)
+                return
 
-    def check_for_portal(self):
+            self.finish_step(sprite)
+            if not self.continue_moving(sprite, keys, start_time + duration):
+                self.stop_sprite(sprite)
+                return
+
+    def start_step(self, sprite, start_time):
         """
-        Check for a portal to change level scene.
+        Claim the next tile for a sprite if it is walkable, free and,
+        for wandering computer characters, inside their wander bounds.
         """
-        portal = pg.sprite.spritecollideany(self.player, self.portals)
+        origin = self.get_tile(sprite)
+        tile = origin[0] + sprite.x_vel, origin[1] + sprite.y_vel
+
+        if self.grid.is_blocked(*tile):
+            return False
+        if not self.occupancy.is_free(tile, sprite):
+            return False
+        if sprite is not self.player and sprite.behavior == c.WANDER:
+            if not sprite.wander_bounds.collidepoint(tile):
+                return False
 
-        if portal:
-            self.level.use_portal = True
-            self.level.portal = portal.name
+        self.step_dict[sprite] = origin, tile, start_time
+        self.occupancy.claim(sprite, tile)
+        return True
 
-    def check_for_blockers(self):
+    def place_sprite(self, sprite, origin, target, elapsed):
         """
-        Checks for collisions with blocker rects.
+        Set a sprite's position part way through a step.
         """
-        player_collided = False
-        sprite_collided_list = []
+        distance = int(elapsed * sprite.speed / 1000.0)
+        sprite.rect.x = origin[0] * 32 + (target[0] - origin[0]) * distance
+        sprite.rect.y = origin[1] * 32 + (target[1] - origin[1]) * distance
+        self.moved(sprite)
 
-        for blocker in self.blockers:
-            if self.player.rect.colliderect(blocker):
-                player_collided = True
+    def finish_step(self, sprite):
+        """
+        Put a sprite on the tile it stepped into and release the tile
+        it left.
+        """
+        origin, target, start_time = self.step_dict.pop(sprite)
+        sprite.rect.topleft = target[0] * 32, target[1] * 32
+        self.occupancy.release(sprite, origin)
+        self.moved(sprite)
 
-        if player_collided:
-            self.reset_after_collision(self.player)
-            self.player.begin_resting()
+    def add_sprite(self, sprite):
+        """
+        Claim the tile of a sprite added to the level.
+        """
+        self.occupancy.claim(sprite, self.get_tile(sprite))
 
-        for sprite in self.sprites:
-            for blocker in self.static_blockers:
-                if sprite.rect.colliderect(blocker):
-                    sprite_collided_list.append(sprite)
-            if sprite.rect.colliderect(self.player.rect):
-                sprite_collided_list.append(sprite)
-            sprite.kill()
-            if pg.sprite.spritecollideany(sprite, self.sprites):
-                sprite_collided_list.append(sprite)
-            self.sprites.add(sprite)
-            for blocker in sprite.wander_box:
-                if sprite.rect.colliderect(blocker):
-                    sprite_collided_list.append(sprite)
-
-
-        for sprite in sprite_collided_list:
-            self.reset_after_collision(sprite)
-            sprite.begin_auto_resting()
+    def remove_sprite(self, sprite):
+        """
+        Release the tiles held by a sprite taken out of the level.
+        """
+        if sprite in self.step_dict:
+            origin, target, start_time = self.step_dict.pop(sprite)
+            self.occupancy.release(sprite, target)
+        self.occupancy.release(sprite, self.get_tile(sprite))
 
-    def reset_after_collision(self, sprite):
-        """Put player back to original position"""
-        if sprite.x_vel != 0:
-                sprite.rect.x -= sprite.x_vel
+    def moved(self, sprite):
+        """
+        Let the draw list know a sprite's rect changed.
+        """
+        if self.draw_list is not None:
+            self.draw_list.move(sprite)
+
+    def continue_moving(self, sprite, keys, start_time):
+        """
+        Decide whether a sprite that just entered a tile takes another
+        step.  Computer characters take one step at a time.  The player
+        keeps walking while a direction key is held and no trigger on
+        the new tile stopped it.
+        """
+        if sprite is not self.player:
+            return False
+        if self.check_for_triggers():
+            return False
+
+        direction = sprite.get_input_direction(keys)
+        if direction is None:
+            return False
+
+        sprite.begin_moving(direction)
+        sprite.move_timer = start_time
+        return True
+
+    def stop_sprite(self, sprite):
+        """
+        Bring a sprite to rest.
+        """
+        if sprite is self.player:
+            sprite.begin_resting()
         else:
-            sprite.rect.y -= sprite.y_vel
+            sprite.begin_auto_resting()
+
+    def check_for_triggers(self):
+        """
+        Look up the triggers on the tile the player just stepped onto.
+        Return True if one of them should stop the player.
+        """
+        encounter_rate = c.ENCOUNTER_RATE
+        stop = False
 
-    def check_for_battle(self):
+        for trigger in self.trigger_map.get_triggers(self.get_tile(self.player)):
+            if trigger.kind == 'portal':
+                self.level.use_portal = True
+                self.level.portal = trigger.name
+                stop = True
+            elif trigger.kind == 'encounter zone':
+                encounter_rate = trigger.rate
+            elif trigger.kind == 'event':
+                self.level.dialogue_handler.begin_dialogue(trigger)
+                stop = True
+
+        return self.check_for_battle(encounter_rate) or stop
+
+    def check_for_battle(self, encounter_rate):
         """
-        Switch scene to battle 1/5 times if battles are allowed.
+        Count down to a random battle if battles are allowed.  Return
+        True if a battle is starting.
         """
         if self.level.allow_battles:
-            self.level.game_data['battle counter'] -= 5
+            self.level.game_data['battle counter'] -= encounter_rate
             if self.level.game_data['battle counter'] <= 0:
                 self.level.switch_to_battle = True
 
-
-
+        return self.level.switch_to_battle
@@ -3,7 +3,7 @@ Attack equipment for battles.
 """
 import copy
 import pygame as pg
-from .. import tools, setup
+from .. import tools, setup, clock
 from .. import constants as c
 
 
@@ -16,7 +16,6 @@ class Sword(object):
         self.sprite_sheet = setup.GFX['shopsigns']
         self.image_list = self.make_image_list()
         self.index = 0
-        self.timer = 0.0
 
     def make_image_list(self):
         """
@@ -39,12 +38,11 @@ class Sword(object):
         return new_rect
 
     def update(self, current_time):
-        if (current_time - self.timer) > 60:
-            self.timer = current_time
-            if self.index == 0:
-                self.index += 1
-            else:
-                self.index -= 1
+        """
+        Set animation frame from the sword timeline.
+        """
+        self.index = clock.CLOCK.get_frame(c.SWORD_TIMELINE,
+                                           len(self.image_list))
 
     def draw(self, surface):
         """
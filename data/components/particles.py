@@ -0,0 +1,119 @@
+"""
+Particle effects for battles and spells.  Particle state is kept in
+NumPy arrays so thousands of particles are updated in one vectorized
+step and written to the screen with surfarray.
+"""
+from __future__ import division
+import numpy as np
+import pygame as pg
+from .. import constants as c
+
+
+class ParticleSystem(object):
+    """
+    Fixed capacity pool of particles.  Live particles are packed at the
+    front of every array.
+    """
+    def __init__(self, capacity=c.MAX_PARTICLES):
+        self.capacity = capacity
+        self.count = 0
+        self.position = np.zeros((capacity, 2), np.float32)
+        self.velocity = np.zeros((capacity, 2), np.float32)
+        self.gravity = np.zeros(capacity, np.float32)
+        self.life = np.zeros(capacity, np.float32)
+        self.max_life = np.ones(capacity, np.float32)
+        self.color = np.zeros((capacity, 3), np.float32)
+        self.current_time = None
+
+    def emit(self, pos, amount, color, speed=120, life=1000, gravity=0):
+        """
+        Spray amount particles out from pos.  speed is in pixels per
+        second, life in milliseconds and gravity in pixels per second
+        squared (negative values rise).
+        """
+        amount = min(amount, self.capacity - self.count)
+        start, end = self.count, self.count + amount
+
+        angle = np.random.uniform(0, 2 * np.pi, amount)
+        magnitude = np.random.uniform(speed * .25, speed, amount)
+        self.position[start:end] = pos
+        self.velocity[start:end, 0] = np.cos(angle) * magnitude
+        self.velocity[start:end, 1] = np.sin(angle) * magnitude
+        self.gravity[start:end] = gravity
+        self.life[start:end] = np.random.uniform(life * .5, life, amount)
+        self.max_life[start:end] = self.life[start:end]
+        shade = np.random.uniform(.7, 1.0, (amount, 1))
+        self.color[start:end] = np.array(color, np.float32) * shade
+
+        self.count = end
+
+    def update(self, current_time):
+        """
+        Move all particles and drop the ones that have expired.
+        """
+        if self.current_time is None:
+            self.current_time = current_time
+        dt = min(current_time - self.current_time, 100) / 1000
+        self.current_time = current_time
+
+        count = self.count
+        if not count:
+            return
+
+        self.velocity[:count, 1] += self.gravity[:count] * dt
+        self.position[:count] += self.velocity[:count] * dt
+        self.life[:count] -= dt * 1000
+
+        alive = self.life[:count] > 0
+        if not alive.all():
+            self.count = int(alive.sum())
+            for array in (self.position, self.velocity, self.gravity,
+                          self.life, self.max_life, self.color):
+                array[:self.count] = array[:count][alive]
+
+    def map_colors(self, surface, colors):
+        """
+        Convert an array of RGB colours to the pixel format of surface.
+        """
+        colors = colors.astype(np.uint32)
+        shifts = surface.get_shifts()
+        losses = surface.get_losses()
+        pixels = np.uint32(surface.get_masks()[3])
+
+        for channel in range(3):
+            pixels = pixels | ((colors[:, channel] >> losses[channel])
+                               << shifts[channel])
+
+        return pixels
+
+    def draw(self, surface):
+        """
+        Write all particles straight into the pixels of surface as
+        2x2 squares, faded by their remaining life.
+        """
+        count = self.count
+        if not count:
+            return
+
+        width, height = surface.get_size()
+        x = self.position[:count, 0].astype(np.int32)
+        y = self.position[:count, 1].astype(np.int32)
+        visible = (x >= 0) & (x < width - 1) & (y >= 0) & (y < height - 1)
+        x, y = x[visible], y[visible]
+
+        fade = (self.life[:count] / self.max_life[:count])[visible]
+        colors = self.color[:count][visible] * fade[:, np.newaxis]
+        mapped = self.map_colors(surface, colors)
+
+        pixels = pg.surfarray.pixels2d(surface)
+        pixels[x, y] = mapped
+        pixels[x + 1, y] = mapped
+        pixels[x, y + 1] = mapped
+        pixels[x + 1, y + 1] = mapped
+        del pixels
+
+    def clear(self):
+        """
+        Remove every particle.
+        """
+        self.count = 0
@@ -1,8 +1,8 @@
 from __future__ import division
 from itertools import izip
-import math, random, copy, sys
+import random, copy, sys
 import pygame as pg
-from .. import setup, observer
+from .. import setup, observer, clock
 from .. import constants as c
 
 #Python 2/3 compatibility.
@@ -31,16 +31,19 @@ class Person(pg.sprite.Sprite):
         self.vector_dict = self.create_vector_dict()
         self.x_vel = 0
         self.y_vel = 0
-        self.timer = 0.0
+        self.speed = c.NPC_SPEED
         self.move_timer = 0.0
         self.current_time = 0.0
         self.state = state
-        self.blockers = self.set_blockers()
         self.location = self.get_tile_location()
         self.dialogue = ['Location: ' + str(self.location)]
         self.default_direction = direction
         self.item = None
-        self.wander_box = self.make_wander_box()
+        self.wander_bounds = self.make_wander_bounds()
+        self.behavior = c.WANDER
+        self.move_delay_dict = self.make_move_delay_dict()
+        self.target = None
+        self.pathfinder = None
         self.observers = [observer.SoundEffects()]
         self.health = 0
         self.death_image = pg.transform.scale2x(self.image)
@@ -122,86 +125,47 @@ class Person(pg.sprite.Sprite):
         """
         Update sprite.
         """
-        self.blockers = self.set_blockers()
         self.current_time = current_time
         self.image_list = self.animation_dict[self.direction]
         state_function = self.state_dict[self.state]
         state_function()
         self.location = self.get_tile_location()
 
-    def set_blockers(self):
+    def coarse_update(self, current_time, *args):
         """
-        Sets blockers to prevent collision with other sprites.
+        Cheap update for sprites far outside the viewport.  Wander timers
+        keep running so tile moves continue, but nothing is animated.
         """
-        blockers = []
-
-        if self.state == 'resting' or self.state == 'autoresting':
-            blockers.append(pg.Rect(self.rect.x, self.rect.y, 32, 32))
-
-        elif self.state == 'moving' or self.state == 'automoving':
-            if self.rect.x % 32 == 0:
-                tile_float = self.rect.y / float(32)
-                tile1 = (self.rect.x, math.ceil(tile_float)*32)
-                tile2 = (self.rect.x, math.floor(tile_float)*32)
-                tile_rect1 = pg.Rect(tile1[0], tile1[1], 32, 32)
-                tile_rect2 = pg.Rect(tile2[0], tile2[1], 32, 32)
-                blockers.extend([tile_rect1, tile_rect2])
-
-            elif self.rect.y % 32 == 0:
-                tile_float = self.rect.x / float(32)
-                tile1 = (math.ceil(tile_float)*32, self.rect.y)
-                tile2 = (math.floor(tile_float)*32, self.rect.y)
-                tile_rect1 = pg.Rect(tile1[0], tile1[1], 32, 32)
-                tile_rect2 = pg.Rect(tile2[0], tile2[1], 32, 32)
-                blockers.extend([tile_rect1, tile_rect2])
-
-        return blockers
+        self.current_time = current_time
+        self.location = self.get_tile_location()
+        if self.state == 'autoresting':
+            self.check_to_auto_move()
 
     def get_tile_location(self):
         """
-        Convert pygame coordinates into tile coordinates.
+        Convert pygame coordinates into an integer tile coordinate tuple.
+        An axis the sprite is between tiles on reads as 0.
         """
-        if self.rect.x == 0:
-            tile_x = 0
-        elif self.rect.x % 32 == 0:
-            tile_x = (self.rect.x / 32)
+        if self.rect.x % 32 == 0:
+            tile_x = self.rect.x // 32
         else:
             tile_x = 0
 
-        if self.rect.y == 0:
-            tile_y = 0
-        elif self.rect.y % 32 == 0:
-            tile_y = (self.rect.y / 32)
+        if self.rect.y % 32 == 0:
+            tile_y = self.rect.y // 32
         else:
             tile_y = 0
 
-        return [tile_x, tile_y]
+        return tile_x, tile_y
 
-
-    def make_wander_box(self):
+    def make_wander_bounds(self):
         """
-        Make a list of rects that surround the initial location
-        of a sprite to limit his/her wandering.
+        Make a rect, in tile coordinates, of the tiles around the initial
+        location of a sprite that he/she may wander on.
         """
-        x = int(self.location[0])
-        y = int(self.location[1])
-        box_list = []
-        box_rects = []
-
-        for i in range(x-3, x+4):
-            box_list.append([i, y-3])
-            box_list.append([i, y+3])
-
-        for i in range(y-2, y+3):
-            box_list.append([x-3, i])
-            box_list.append([x+3, i])
+        x, y = self.location
 
-        for box in box_list:
-            left = box[0]*32
-            top = box[1]*32
-            box_rects.append(pg.Rect(left, top, 32, 32))
-
-        return box_rects
+        return pg.Rect(x - 2, y - 2, 5, 5)
 
     def resting(self):
         """
@@ -224,19 +188,13 @@ class Person(pg.sprite.Sprite):
             'Not centered on tile'
 
     def animated_resting(self):
-        self.animation(500)
+        self.animation(c.IDLE_TIMELINE)
 
-    def animation(self, freq=100):
+    def animation(self, timeline=c.WALK_TIMELINE):
         """
-        Adjust sprite image frame based on timer.
+        Adjust sprite image frame based on a shared animation timeline.
         """
-        if (self.current_time - self.timer) > freq:
-            if self.index < (len(self.image_list) - 1):
-                self.index += 1
-            else:
-                self.index = 0
-            self.timer = self.current_time
-
+        self.index = clock.CLOCK.get_frame(timeline, len(self.image_list))
         self.image = self.image_list[self.index]
 
     def begin_moving(self, direction):
@@ -245,15 +203,9 @@ class Person(pg.sprite.Sprite):
         """
         self.direction = direction
         self.image_list = self.animation_dict[direction]
-        self.timer = self.current_time
         self.move_timer = self.current_time
         self.state = 'moving'
-
-        if self.rect.x % 32 == 0:
-            self.y_vel = self.vector_dict[self.direction][1]
-        if self.rect.y % 32 == 0:
-            self.x_vel = self.vector_dict[self.direction][0]
-
+        self.x_vel, self.y_vel = self.vector_dict[direction]
 
     def begin_resting(self):
         """
@@ -297,13 +249,47 @@ class Person(pg.sprite.Sprite):
         if self.rect.x % 32 != 0:
             self.correct_position(self.rect.x)
 
-        if (self.current_time - self.move_timer) > 2000:
-            direction_list = ['up', 'down', 'left', 'right']
-            random.shuffle(direction_list)
-            direction = direction_list[0]
-            self.begin_auto_moving(direction)
+        self.check_to_auto_move()
+
+    def check_to_auto_move(self):
+        """
+        Start moving once the move timer for the sprite's behavior runs
+        out.  Wandering sprites pick a random direction; following and
+        fleeing sprites take a step from the pathfinder.
+        """
+        if (self.current_time - self.move_timer) > self.move_delay_dict[self.behavior]:
+            if self.behavior == c.WANDER:
+                direction_list = ['up', 'down', 'left', 'right']
+                random.shuffle(direction_list)
+                direction = direction_list[0]
+            else:
+                goal = self.target.rect.x // 32, self.target.rect.y // 32
+                direction = self.pathfinder.get_step(self.location, goal,
+                                                     self.behavior == c.FLEE)
+            if direction:
+                self.begin_auto_moving(direction)
             self.move_timer = self.current_time
 
+    def make_move_delay_dict(self):
+        """
+        Make a dictionary of the wait, in milliseconds, between automatic
+        steps for each behavior.
+        """
+        delay_dict = {c.WANDER: 2000,
+                      c.FOLLOW: 250,
+                      c.FLEE: 250}
+
+        return delay_dict
+
+    def set_behavior(self, behavior, target=None, pathfinder=None):
+        """
+        Set how the sprite moves on its own.  Following and fleeing
+        sprites step toward or away from target using pathfinder.
+        """
+        self.behavior = behavior
+        self.target = target
+        self.pathfinder = pathfinder
+
     def correct_position(self, rect_pos):
         """
         Adjust sprite position to be centered on tile.
@@ -436,7 +422,7 @@ class Person(pg.sprite.Sprite):
         self.image_list = []
         for image in self.small_image_list:
             self.image_list.append(pg.transform.scale2x(image))
-        self.animation(500)
+        self.animation(c.IDLE_TIMELINE)
 
     def knock_back(self):
         """
@@ -501,6 +487,7 @@ class Player(Person):
         self.healing_alpha = 0
         self.fade_in = True
         self.game_data = game_data
+        self.speed = c.PLAYER_SPEED
         self.index = 1
         self.image = self.image_list[self.index]
 
@@ -512,22 +499,11 @@ class Player(Person):
         return self.game_data['player stats']['Level']
 
 
-    def create_vector_dict(self):
-        """Return a dictionary of x and y velocities set to
-        direction keys."""
-        vector_dict = {'up': (0, -2),
-                       'down': (0, 2),
-                       'left': (-2, 0),
-                       'right': (2, 0)}
-
-        return vector_dict
-
     def update(self, keys, current_time):
         """Updates player behavior"""
         self.current_time = current_time
         self.damage_animation()
         self.healing_animation()
-        self.blockers = self.set_blockers()
         self.keys = keys
         self.check_for_input()
         state_function = self.state_dict[self.state]
@@ -585,14 +561,22 @@ class Player(Person):
     def check_for_input(self):
         """Checks for player input"""
         if self.state == 'resting':
-            if self.keys[pg.K_UP]:
-                self.begin_moving('up')
-            elif self.keys[pg.K_DOWN]:
-                self.begin_moving('down')
-            elif self.keys[pg.K_LEFT]:
-                self.begin_moving('left')
-            elif self.keys[pg.K_RIGHT]:
-                self.begin_moving('right')
+            direction = self.get_input_direction(self.keys)
+            if direction:
+                self.begin_moving(direction)
+
+    def get_input_direction(self, keys):
+        """
+        Return the direction of the arrow key held down, or None.
+        """
+        if keys[pg.K_UP]:
+            return 'up'
+        elif keys[pg.K_DOWN]:
+            return 'down'
+        elif keys[pg.K_LEFT]:
+            return 'left'
+        elif keys[pg.K_RIGHT]:
+            return 'right'
 
     def calculate_hit(self):
         """
@@ -648,7 +632,6 @@ class Chest(Person):
 
     def update(self, current_time, *args):
         """Implemented by inheriting classes"""
-        self.blockers = self.set_blockers()
         self.current_time = current_time
         state_function = self.state_dict[self.state]
         state_function()
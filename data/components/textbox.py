@@ -87,6 +87,7 @@ class TextHandler(object):
         self.textbox = None
         self.allow_input = False
         self.level = level
+        self.occupancy = level.collision_handler.occupancy
         self.last_textbox_timer = 0.0
         self.game_data = level.game_data
         self.observers = [observer.SoundEffects()]
@@ -95,11 +96,10 @@ class TextHandler(object):
     def update(self, keys, current_time):
         """Checks for the creation of Dialogue boxes"""
         if keys[pg.K_SPACE] and not self.textbox and self.allow_input:
-            for sprite in self.sprites:
-                if (current_time - self.last_textbox_timer) > 300:
-                    if self.player.state == 'resting':
-                        self.allow_input = False
-                        self.check_for_dialogue(sprite)
+            if (current_time - self.last_textbox_timer) > 300:
+                if self.player.state == 'resting':
+                    self.allow_input = False
+                    self.check_for_dialogue()
 
         if self.textbox:
             if self.talking_sprite.name == 'treasurechest':
@@ -171,38 +171,48 @@ class TextHandler(object):
         """
         End dialogue state for level.
         """
+        sprite = self.talking_sprite
         self.talking_sprite = None
         self.level.state = 'normal'
         self.textbox = None
         self.last_textbox_timer = current_time
-        self.reset_sprite_direction()
+        self.reset_sprite_direction(sprite)
         self.notify(self, c.CLICK)
 
-    def check_for_dialogue(self, sprite):
-        """Checks if a sprite is in the correct location to give dialogue"""
+    def begin_dialogue(self, sprite):
+        """
+        Open a dialogue box for a sprite or event trigger.
+        """
+        self.textbox = DialogueBox(sprite.dialogue)
+        self.talking_sprite = sprite
+
+    def make_facing_dict(self):
+        """
+        Make a dictionary of the tile offset in front of the player and
+        the direction a sprite there turns to, keyed by player direction.
+        """
+        facing_dict = {'up': ((0, -1), 'down'),
+                       'down': ((0, 1), 'up'),
+                       'left': ((-1, 0), 'right'),
+                       'right': ((1, 0), 'left')}
+
+        return facing_dict
+
+    def check_for_dialogue(self):
+        """
+        Look up the sprite on the tile the player is facing and start
+        its dialogue.
+        """
         player = self.player
         tile_x, tile_y = player.location
+        (dx, dy), sprite_direction = self.make_facing_dict()[player.direction]
+        tile = tile_x + dx, tile_y + dy
+        sprite = self.occupancy.get_occupant(tile)
 
-        if player.direction == 'up':
-            if sprite.location == [tile_x, tile_y - 1]:
-                self.textbox = DialogueBox(sprite.dialogue)
-                sprite.direction = 'down'
-                self.talking_sprite = sprite
-        elif player.direction == 'down':
-            if sprite.location == [tile_x, tile_y + 1]:
-                self.textbox = DialogueBox(sprite.dialogue)
-                sprite.direction = 'up'
-                self.talking_sprite = sprite
-        elif player.direction == 'left':
-            if sprite.location == [tile_x - 1, tile_y]:
-                self.textbox = DialogueBox(sprite.dialogue)
-                sprite.direction = 'right'
-                self.talking_sprite = sprite
-        elif player.direction == 'right':
-            if sprite.location == [tile_x + 1, tile_y]:
-                self.textbox = DialogueBox(sprite.dialogue)
-                sprite.direction = 'left'
-                self.talking_sprite = sprite
+        if sprite is not None and sprite is not player:
+            if sprite.location == tile:
+                self.begin_dialogue(sprite)
+                sprite.direction = sprite_direction
 
     def check_for_item(self):
         """Checks if sprite has an item to give to the player"""
@@ -250,11 +260,10 @@ class TextHandler(object):
         elif sprite.name == 'oldmanbrother':
             self.game_data['brother elixir'] = False
 
-    def reset_sprite_direction(self):
-        """Reset sprite to default direction"""
-        for sprite in self.sprites:
-            if sprite.state == 'resting':
-                sprite.direction = sprite.default_direction
+    def reset_sprite_direction(self, sprite):
+        """Reset the sprite that was talking to its default direction"""
+        if sprite in self.sprites and sprite.state == 'resting':
+            sprite.direction = sprite.default_direction
 
 
     def draw(self, surface):
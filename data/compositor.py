@@ -0,0 +1,53 @@
+"""
+Draws a level's frame: the map under the viewport, then its sprites in
+depth order, straight onto the screen.
+"""
+import pygame as pg
+from . import clock
+from . import constants as c
+
+
+class Compositor(object):
+    """
+    Composites a level's map and sprites onto the target surface in
+    one pass.  Sprites are drawn at their level position moved by the
+    viewport offset, so no full map sized surface is needed.  In
+    NATIVE_RESOLUTION mode the map goes through a small back buffer
+    that is scaled up once.  A Lighting, if given, darkens the frame
+    last.
+    """
+    def __init__(self, tile_map, draw_list, native=c.NATIVE_RESOLUTION,
+                 lighting=None):
+        self.tile_map = tile_map
+        self.draw_list = draw_list
+        self.lighting = lighting
+        if native:
+            self.back_buffer = pg.Surface(c.NATIVE_SIZE).convert()
+        else:
+            self.back_buffer = None
+
+    def draw(self, surface, viewport):
+        """
+        Draw the level as seen through viewport onto surface.
+        """
+        if self.back_buffer:
+            self.draw_native_map(surface, viewport)
+        else:
+            self.tile_map.draw(surface, viewport, (0, 0),
+                               clock.CLOCK.current_time)
+
+        self.draw_list.draw(surface, viewport, (-viewport.x, -viewport.y))
+        if self.lighting:
+            self.lighting.draw(surface, viewport)
+
+    def draw_native_map(self, surface, viewport):
+        """
+        Draw the map at native resolution into the back buffer and scale
+        it up onto surface.  Character art is already 32 pixels a tile,
+        so sprites are drawn after the upscale.
+        """
+        native_view = pg.Rect((viewport.x // 2, viewport.y // 2),
+                              self.back_buffer.get_size())
+        self.tile_map.draw(self.back_buffer, native_view, (0, 0),
+                           clock.CLOCK.current_time)
+        pg.transform.scale2x(self.back_buffer, surface)
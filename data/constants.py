@@ -96,3 +96,95 @@ DEATH_TRANSITION_SPEED = 5
 NORMAL = 'normal'
 TRANSITION_IN = 'transition in'
 TRANSITION_OUT = 'transition out'
+
+#Sprites further than this many pixels outside the viewport get a
+#coarse update with no animation.
+UPDATE_MARGIN = 64
+
+#Walking speeds in pixels per second.
+PLAYER_SPEED = 120
+NPC_SPEED = 60
+
+#Amount the battle counter drops per step outside any encounter zone.
+ENCOUNTER_RATE = 5
+#Battle counter at or below which the next random battle is built
+#ahead of time.
+BATTLE_PREPARE_COUNTER = 25
+
+MAX_PARTICLES = 8192
+
+#MAP CACHE
+
+#Bytes of parsed maps and map images kept in memory.
+MAP_CACHE_BUDGET = 48 * 1024 * 1024
+#Directory for map images kept between runs, or None to keep them
+#in memory only.
+MAP_CACHE_DIR = None
+#Width and height, in tiles, of a lazily rendered map chunk.
+MAP_CHUNK_TILES = 8
+#Chunks further than this many pixels from the viewport are dropped.
+MAP_CHUNK_MARGIN = 256
+#Bytes of decoded tileset images held for maps parsed ahead of time.
+PREFETCH_BUDGET = 16 * 1024 * 1024
+
+#RENDERING
+
+#Render level maps at their native 16 pixel tile size into a back
+#buffer that is scaled up once per frame.
+NATIVE_RESOLUTION = False
+NATIVE_SIZE = (400, 304)
+#Size, in pixels, of the cells sprites are bucketed in for drawing.
+DRAW_CELL_SIZE = 128
+
+#LIGHTING
+
+DARK_LEVELS = [DUNGEON, DUNGEON2, DUNGEON3, DUNGEON4, DUNGEON5]
+#Grey level, out of 255, of the light outside any light's reach.
+AMBIENT_LIGHT = 24
+#Radii, in pixels, of the player's torch and of TMX light objects
+#without a radius property.
+PLAYER_LIGHT_RADIUS = 160
+LIGHT_RADIUS = 96
+#Most lights drawn into the darkness overlay at once.
+MAX_LIGHTS = 8
+
+#WORLD STREAMING
+
+#Play levels that have a Tiled .world layout as one continuous world
+#stitched from its maps.
+WORLD_STREAMING = False
+#Distances, in pixels, from the viewport at which a world's maps are
+#parsed in the background, loaded and unloaded again.
+WORLD_PREFETCH_MARGIN = 1024
+WORLD_LOAD_MARGIN = 512
+WORLD_UNLOAD_MARGIN = 1536
+
+#MINIMAP
+
+#Draw the minimap over the top right corner of levels.
+MINIMAP_HUD = False
+MINIMAP_HUD_RECT = (656, 16, 128, 128)
+#Pixels a tile on the HUD minimap, and the most on the player menu's.
+MINIMAP_HUD_SCALE = 4
+MINIMAP_MENU_SCALE = 8
+#Brightness of wall tiles relative to their tile colour.
+MINIMAP_WALL_SHADE = .6
+#Smallest width, in pixels, of the dots marking sprites.
+MINIMAP_MARKER_SIZE = 3
+MINIMAP_PLAYER_COLOR = WHITE
+MINIMAP_SPRITE_COLOR = RED
+
+#ANIMATION TIMELINES
+
+WALK_TIMELINE = 'walk-100ms'
+IDLE_TIMELINE = 'idle-500ms'
+SWORD_TIMELINE = 'sword-60ms'
+
+#NPC BEHAVIORS
+
+WANDER = 'wander'
+FOLLOW = 'follow'
+FLEE = 'flee'
+
+#Most distance fields a level's pathfinder keeps cached at once.
+DISTANCE_FIELD_CACHE = 32
@@ -0,0 +1,165 @@
+"""
+Depth sorted drawing for level sprites.  Sprites lower on the screen
+are drawn last so characters overlap correctly when passing behind
+each other.  Only sprites inside the area being drawn are looked at,
+found through a grid of cells so the cost follows what is on screen
+rather than how many sprites the level holds.
+"""
+import sys
+from . import constants as c
+
+#Python 2/3 compatibility.
+if sys.version_info[0] == 2:
+    range = xrange
+
+
+class SpatialIndex(object):
+    """
+    Sprites bucketed by the square cells their rects overlap.
+    """
+    def __init__(self, cell_size=c.DRAW_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cell_dict = {}
+        self.sprite_dict = {}
+
+    def __len__(self):
+        return len(self.sprite_dict)
+
+    def __iter__(self):
+        return iter(self.sprite_dict)
+
+    def __contains__(self, sprite):
+        return sprite in self.sprite_dict
+
+    def get_cells(self, rect):
+        """
+        Return the cells a rect overlaps.
+        """
+        size = self.cell_size
+        columns = range(rect.left // size, (rect.right - 1) // size + 1)
+        rows = range(rect.top // size, (rect.bottom - 1) // size + 1)
+
+        return tuple((column, row) for column in columns for row in rows)
+
+    def add(self, sprite):
+        """
+        Put a sprite in the cells its rect overlaps.
+        """
+        cells = self.get_cells(sprite.rect)
+        self.sprite_dict[sprite] = cells
+        for cell in cells:
+            self.cell_dict.setdefault(cell, set()).add(sprite)
+
+    def remove(self, sprite):
+        """
+        Take a sprite out of its cells.
+        """
+        for cell in self.sprite_dict.pop(sprite, ()):
+            bucket = self.cell_dict[cell]
+            bucket.discard(sprite)
+            if not bucket:
+                del self.cell_dict[cell]
+
+    def move(self, sprite):
+        """
+        Update the cells of a sprite whose rect has moved.
+        """
+        if self.sprite_dict.get(sprite) != self.get_cells(sprite.rect):
+            self.remove(sprite)
+            self.add(sprite)
+
+    def query(self, rect):
+        """
+        Return the set of sprites whose rects overlap rect.
+        """
+        found = set()
+        for cell in self.get_cells(rect):
+            if cell in self.cell_dict:
+                found.update(self.cell_dict[cell])
+
+        return set(sprite for sprite in found if sprite.rect.colliderect(rect))
+
+
+class DrawList(object):
+    """
+    Sprites drawn back to front by the bottom of their rects.  Only the
+    visible sprites are kept in order.  They move at most a few pixels
+    a frame, so last frame's order is nearly sorted and an insertion
+    sort only does work for the entries that changed place.
+    """
+    def __init__(self, sprites=(), cell_size=c.DRAW_CELL_SIZE):
+        self.index = SpatialIndex(cell_size)
+        self.visible_list = []
+        for sprite in sprites:
+            self.index.add(sprite)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        return iter(self.index)
+
+    @staticmethod
+    def get_depth(sprite):
+        """
+        Return the depth of a sprite on the map.
+        """
+        return sprite.rect.bottom
+
+    def add(self, sprite):
+        """
+        Add a sprite to be drawn.
+        """
+        self.index.add(sprite)
+
+    def remove(self, sprite):
+        """
+        Stop drawing a sprite.
+        """
+        self.index.remove(sprite)
+        if sprite in self.visible_list:
+            self.visible_list.remove(sprite)
+
+    def move(self, sprite):
+        """
+        Tell the draw list a sprite's rect has moved.
+        """
+        self.index.move(sprite)
+
+    def update_visible(self, area):
+        """
+        Keep the sprites still inside area in their old order and add
+        any that came into view at the end.
+        """
+        visible = self.index.query(area)
+        visible_list = [sprite for sprite in self.visible_list
+                        if sprite in visible]
+        visible.difference_update(visible_list)
+        visible_list.extend(visible)
+        self.visible_list = visible_list
+
+    def sort(self):
+        """
+        Restore draw order of the visible sprites with an insertion
+        sort.  Entries still in order cost a single comparison.
+        """
+        sprite_list = self.visible_list
+
+        for i in range(1, len(sprite_list)):
+            sprite = sprite_list[i]
+            depth = sprite.rect.bottom
+            j = i - 1
+            while j >= 0 and sprite_list[j].rect.bottom > depth:
+                sprite_list[j + 1] = sprite_list[j]
+                j -= 1
+            sprite_list[j + 1] = sprite
+
+    def draw(self, surface, area, offset=(0, 0)):
+        """
+        Blit the sprites inside area to surface in depth order, moved
+        by offset.
+        """
+        self.update_visible(area)
+        self.sort()
+        for sprite in self.visible_list:
+            surface.blit(sprite.image, sprite.rect.move(offset))
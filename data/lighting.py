@@ -0,0 +1,102 @@
+"""
+Torch lighting for dark levels.  A darkness overlay the size of the
+viewport is filled with the ambient light, brightened under each light
+source by a precomputed radial mask, and multiplied onto the frame in
+a single blit.  The overlay is only rebuilt when a light or the
+viewport moves.
+"""
+import numpy as np
+import pygame as pg
+from . import constants as c
+
+
+MASKS = {}
+
+
+def get_light_mask(radius):
+    """
+    Return the cached radial mask of a light, making it the first time
+    a radius is asked for.
+    """
+    if radius not in MASKS:
+        MASKS[radius] = make_light_mask(radius)
+
+    return MASKS[radius]
+
+
+def make_light_mask(radius):
+    """
+    Make a grey square 2*radius wide that is white in the middle and
+    fades to black at radius.
+    """
+    offsets = np.arange(radius * 2) - radius + .5
+    distance = np.hypot(offsets[:, None], offsets[None, :]) / radius
+    brightness = (255 * np.clip(1 - distance ** 2, 0, 1)).astype(np.uint8)
+
+    mask = pg.Surface((radius * 2, radius * 2)).convert()
+    pg.surfarray.blit_array(mask, np.dstack([brightness] * 3))
+
+    return mask
+
+
+class Light(object):
+    """
+    A fixed light placed in a TMX map.
+    """
+    def __init__(self, x, y):
+        self.rect = pg.Rect(x, y, 32, 32)
+
+
+class Lighting(object):
+    """
+    Darkens a level outside the reach of its lights.  Sources are
+    (sprite, radius) pairs; anything with a rect can give light.
+    """
+    def __init__(self, size, sources, ambient=c.AMBIENT_LIGHT):
+        self.sources = sources
+        self.ambient = (ambient, ambient, ambient)
+        self.overlay = pg.Surface(size).convert()
+        self.key = None
+
+    def get_visible_lights(self, viewport):
+        """
+        Return the viewport relative (x, y, radius) of the lights that
+        reach into viewport, nearest the middle first and at most
+        MAX_LIGHTS of them.
+        """
+        lights = []
+
+        for sprite, radius in self.sources:
+            x, y = sprite.rect.center
+            reach = pg.Rect(x - radius, y - radius, radius * 2, radius * 2)
+            if reach.colliderect(viewport):
+                lights.append((x - viewport.x, y - viewport.y, radius))
+
+        if len(lights) > c.MAX_LIGHTS:
+            middle_x, middle_y = viewport.w // 2, viewport.h // 2
+            lights.sort(key=lambda light: (light[0] - middle_x) ** 2 +
+                                          (light[1] - middle_y) ** 2)
+            del lights[c.MAX_LIGHTS:]
+
+        return tuple(lights)
+
+    def make_overlay(self, lights):
+        """
+        Fill the overlay with the ambient light and brighten it under
+        each light.
+        """
+        self.overlay.fill(self.ambient)
+        for x, y, radius in lights:
+            self.overlay.blit(get_light_mask(radius), (x - radius, y - radius),
+                              special_flags=pg.BLEND_RGB_MAX)
+
+    def draw(self, surface, viewport):
+        """
+        Darken surface, which shows the level through viewport.
+        """
+        lights = self.get_visible_lights(viewport)
+        if lights != self.key:
+            self.make_overlay(lights)
+            self.key = lights
+
+        surface.blit(self.overlay, (0, 0), special_flags=pg.BLEND_RGB_MULT)
@@ -1,5 +1,5 @@
 from data.states import shop, levels, battle, main_menu, death
-from data.states import credits
+from data.states import credits, world_level
 from . import setup, tools
 from . import constants as c
 
@@ -28,6 +28,16 @@ LOADGAME = 'load game'
 CREDITS = 'credits'
 
 
+def make_level(name, battles=False):
+    """
+    Make a level, streamed as one world if it has a world layout and
+    streaming is on.
+    """
+    if c.WORLD_STREAMING and name in setup.WORLDS:
+        return world_level.WorldLevel(name, battles)
+    return levels.LevelState(name, battles)
+
+
 def main():
     """Add states to control here"""
     run_it = tools.Control(setup.ORIGINAL_CAPTION)
@@ -35,7 +45,7 @@ def main():
                   TOWN: levels.LevelState(TOWN),
                   CASTLE: levels.LevelState(CASTLE),
                   HOUSE: levels.LevelState(HOUSE),
-                  OVERWORLD: levels.LevelState(OVERWORLD, True),
+                  OVERWORLD: make_level(OVERWORLD, True),
                   BROTHER_HOUSE: levels.LevelState(BROTHER_HOUSE),
                   INN: shop.Inn(),
                   ARMOR_SHOP: shop.ArmorShop(),
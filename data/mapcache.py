@@ -0,0 +1,224 @@
+"""
+Cache of parsed TMX maps, their finished 2x map images, chunked maps
+and minimaps, so that re-entering a level doesn't parse, render and scale the
+map again.
+Entries are keyed by the TMX file's path and modification time, kept
+in least recently used order and evicted once they go over a byte
+budget.  Map images can also be kept on disk between runs, and maps a
+level leads to can be parsed ahead of time on a background thread.
+"""
+import os
+from collections import OrderedDict
+import pygame as pg
+from . import tilerender
+from . import prefetch
+from . import minimap
+from . import constants as c
+
+
+class MapCache(object):
+    """
+    In memory LRU of map renderers and images, with an optional
+    directory of PNG map images behind it.
+    """
+    def __init__(self, budget=c.MAP_CACHE_BUDGET, directory=c.MAP_CACHE_DIR):
+        self.budget = budget
+        self.directory = directory
+        self.entry_dict = OrderedDict()
+        self.size = 0
+        self.prefetcher = prefetch.Prefetcher()
+
+    def get_key(self, filename):
+        """
+        Return the cache key for a TMX file.
+        """
+        return os.path.abspath(filename), os.path.getmtime(filename)
+
+    def get_entry(self, filename):
+        """
+        Return the cache entry for a TMX file, parsing the map if it
+        isn't cached.
+        """
+        key = self.get_key(filename)
+
+        if key in self.entry_dict:
+            entry = self.entry_dict.pop(key)
+        else:
+            self.discard_path(key[0])
+            prepared = self.prefetcher.take(key)
+            if prepared:
+                renderer = tilerender.Renderer(filename, *prepared)
+            else:
+                renderer = tilerender.Renderer(filename)
+            entry = {'renderer': renderer,
+                     'image': None,
+                     'chunked map': None,
+                     'minimap': None,
+                     'size': self.get_renderer_size(renderer)}
+            self.size += entry['size']
+
+        self.entry_dict[key] = entry
+        self.evict()
+        return entry
+
+    def prefetch(self, filenames):
+        """
+        Parse the TMX files that aren't cached in the background, so
+        that loading them later only has to convert their tiles.
+        """
+        files = []
+        for filename in filenames:
+            key = self.get_key(filename)
+            if key not in self.entry_dict:
+                files.append((key, filename))
+
+        self.prefetcher.request(files)
+
+    def get_renderer(self, filename):
+        """
+        Return the Renderer for a TMX file.
+        """
+        return self.get_entry(filename)['renderer']
+
+    def get_map_image(self, filename):
+        """
+        Return the 2x map image for a TMX file.  The image is shared,
+        so it must not be drawn on.
+        """
+        entry = self.get_entry(filename)
+
+        if entry['image'] is None:
+            image = self.load_image(filename)
+            if image is None:
+                image = entry['renderer'].make_2x_map()
+                self.save_image(filename, image)
+            entry['image'] = image
+            size = self.get_surface_size(image)
+            entry['size'] += size
+            self.size += size
+            self.evict()
+
+        return entry['image']
+
+    def get_chunked_map(self, filename):
+        """
+        Return the ChunkedMap for a TMX file, at native scale in
+        NATIVE_RESOLUTION mode.  Chunks rendered on an earlier visit are
+        kept until the map evicts them itself.
+        """
+        entry = self.get_entry(filename)
+
+        if entry['chunked map'] is None:
+            scale = 1 if c.NATIVE_RESOLUTION else 2
+            entry['chunked map'] = tilerender.ChunkedMap(entry['renderer'],
+                                                         scale=scale)
+
+        return entry['chunked map']
+
+    def get_minimap(self, filename, blocked):
+        """
+        Return the one pixel a tile minimap of a TMX file.  blocked is
+        the map's array of walls, which only changes with the file.
+        The image is shared, so it must not be drawn on.
+        """
+        entry = self.get_entry(filename)
+
+        if entry['minimap'] is None:
+            image = minimap.make_minimap_image(entry['renderer'].tmx_data,
+                                               blocked)
+            entry['minimap'] = image
+            size = self.get_surface_size(image)
+            entry['size'] += size
+            self.size += size
+
+        return entry['minimap']
+
+    def get_total_size(self):
+        """
+        Return the bytes held, including chunks rendered since their
+        entries were made.
+        """
+        chunk_size = sum(entry['chunked map'].get_byte_size()
+                         for entry in self.entry_dict.values()
+                         if entry['chunked map'])
+
+        return self.size + chunk_size
+
+    def discard_path(self, path):
+        """
+        Drop entries for an older version of a TMX file.
+        """
+        for key in list(self.entry_dict):
+            if key[0] == path:
+                self.size -= self.entry_dict.pop(key)['size']
+
+    def evict(self):
+        """
+        Drop least recently used entries until the cache is within
+        budget.  The newest entry is always kept.
+        """
+        while self.get_total_size() > self.budget and len(self.entry_dict) > 1:
+            key, entry = self.entry_dict.popitem(last=False)
+            self.size -= entry['size']
+
+    def clear(self):
+        """
+        Drop every entry held in memory.
+        """
+        self.entry_dict.clear()
+        self.size = 0
+
+    def get_surface_size(self, surface):
+        """
+        Return the number of bytes of pixel data in a surface.
+        """
+        width, height = surface.get_size()
+        return width * height * surface.get_bytesize()
+
+    def get_renderer_size(self, renderer):
+        """
+        Return the number of bytes of tile images a renderer holds.
+        """
+        return sum(self.get_surface_size(image)
+                   for image in renderer.tmx_data.images if image)
+
+    def get_image_path(self, filename):
+        """
+        Return the path of the on disk copy of a map image.
+        """
+        name = os.path.splitext(os.path.basename(filename))[0]
+        mtime = int(os.path.getmtime(filename))
+        return os.path.join(self.directory, '{}-{}.png'.format(name, mtime))
+
+    def load_image(self, filename):
+        """
+        Load a map image from the disk cache, or return None.
+        """
+        if not self.directory:
+            return None
+
+        path = self.get_image_path(filename)
+        if not os.path.isfile(path):
+            return None
+
+        try:
+            return pg.image.load(path).convert()
+        except pg.error:
+            return None
+
+    def save_image(self, filename, image):
+        """
+        Save a map image to the disk cache, if there is one.
+        """
+        if not self.directory:
+            return
+
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            pg.image.save(image, self.get_image_path(filename))
+        except (pg.error, OSError, IOError):
+            pass
+
+
+CACHE = MapCache()
@@ -166,8 +166,9 @@ class QuickStats(pg.sprite.Sprite):
 
 
 class InfoBox(pg.sprite.Sprite):
-    def __init__(self, inventory, player_stats):
+    def __init__(self, inventory, player_stats, level):
         super(InfoBox, self).__init__()
+        self.level = level
         self.inventory = inventory
         self.player_stats = player_stats
         self.attack_power = self.get_attack_power()
@@ -186,7 +187,7 @@ class InfoBox(pg.sprite.Sprite):
         self.possible_magic = ['Fire Blast', 'Cure']
         self.quantity_items = ['Healing Potion', 'ELIXIR', 'Ether Potion']
         self.slots = {}
-        self.state = 'invisible'
+        self.state = 'map'
         self.state_dict = self.make_state_dict()
         self.print_slots = True
 
@@ -212,6 +213,7 @@ class InfoBox(pg.sprite.Sprite):
         state_dict = {'stats': self.show_player_stats,
                       'items': self.show_items,
                       'magic': self.show_magic,
+                      'map': self.show_map,
                       'invisible': self.show_nothing}
 
         return state_dict
@@ -352,6 +354,23 @@ class InfoBox(pg.sprite.Sprite):
         self.image = surface
         self.rect = rect
 
+    def show_map(self):
+        """
+        Show the level's minimap, as big as fits, when the menu is
+        opened from a level.
+        """
+        surface, rect = self.make_blank_info_box('MAP')
+        area = pg.Rect(40, 80, rect.width - 80, rect.height - 120)
+        minimap = self.level.minimap
+        scale = minimap.get_fit_scale(area.size)
+
+        map_rect = minimap.get_scaled_image(scale).get_rect(center=area.center)
+        minimap.draw(surface, map_rect.clip(area), scale,
+                     self.level.player, self.level.draw_list.index)
+
+        self.image = surface
+        self.rect = rect
+
     def show_nothing(self):
         """
         Show nothing when the menu is opened from a level.
@@ -421,7 +440,7 @@ class MenuGui(object):
         self.observers = [self.sfx_observer]
         self.inventory = inventory
         self.stats = stats
-        self.info_box = InfoBox(inventory, stats)
+        self.info_box = InfoBox(inventory, stats, level)
         self.gold_box = QuickStats(self.game_data)
         self.selection_box = SelectionBox()
         self.arrow = SmallArrow(self.info_box)
@@ -480,7 +499,7 @@ class MenuGui(object):
                 self.allow_input = False
             elif keys[pg.K_RETURN]:
                 self.level.state = 'normal'
-                self.info_box.state = 'invisible'
+                self.info_box.state = 'map'
                 self.allow_input = False
                 self.arrow_index = 0
                 self.arrow.state = 'selectmenu'
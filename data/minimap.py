@@ -0,0 +1,144 @@
+"""
+Minimaps of a level at one pixel a tile.  The colour of each tile image
+is averaged once with NumPy and the map's layers are blended by how
+much of each tile is opaque, so no map image is rendered or scaled
+down.  Walls from the collision grid are shaded darker.  Scaled copies
+are made once per scale, and the player and the sprites near it are
+marked with small fills each frame.
+"""
+import numpy as np
+import pygame as pg
+from . import pytmx
+from . import constants as c
+
+
+def get_tile_colors(tmx_data):
+    """
+    Return the average colour and the opaque share of every tile image,
+    as arrays indexed by gid.
+    """
+    colors = np.zeros((len(tmx_data.images), 3))
+    opacity = np.zeros(len(tmx_data.images))
+
+    for gid, image in enumerate(tmx_data.images):
+        if image:
+            pixels = pg.surfarray.array3d(image).reshape(-1, 3)
+            if image.get_flags() & pg.SRCALPHA:
+                weights = pg.surfarray.array_alpha(image)
+            else:
+                weights = pg.surfarray.array_colorkey(image)
+            weights = weights.reshape(-1) / 255.
+            total = weights.sum()
+            if total:
+                colors[gid] = (pixels * weights[:, None]).sum(0) / total
+                opacity[gid] = total / len(weights)
+
+    return colors, opacity
+
+
+def make_minimap_image(tmx_data, blocked):
+    """
+    Make a surface with one pixel for each tile of a map.  blocked is
+    the map's (width, height) array of walls from its TileGrid.
+    """
+    colors, opacity = get_tile_colors(tmx_data)
+    pixels = np.zeros((tmx_data.height, tmx_data.width, 3))
+    if tmx_data.background_color:
+        pixels[:] = tuple(tmx_data.background_color)[:3]
+
+    for layer in tmx_data.visibleLayers:
+        if isinstance(layer, pytmx.TiledLayer):
+            gids = np.array(layer.data)
+            alpha = opacity[gids][..., None]
+            pixels = pixels * (1 - alpha) + colors[gids] * alpha
+
+    pixels = pixels.transpose(1, 0, 2)
+    pixels[blocked.astype(np.bool_)] *= c.MINIMAP_WALL_SHADE
+
+    image = pg.Surface((tmx_data.width, tmx_data.height)).convert()
+    pg.surfarray.blit_array(image, pixels.astype(np.uint8))
+
+    return image
+
+
+class Minimap(object):
+    """
+    A level's minimap.  image has one pixel a tile and may be shared
+    with the map cache, so only minimaps made from their own surface
+    should be added to.
+    """
+    def __init__(self, image):
+        self.image = image
+        self.scaled_dict = {}
+
+    def add(self, image, tile_position):
+        """
+        Copy the minimap image of part of the level into this one.
+        """
+        self.image.blit(image, tile_position)
+        self.scaled_dict.clear()
+
+    def get_scaled_image(self, scale):
+        """
+        Return the minimap scaled up to scale pixels a tile.
+        """
+        if scale not in self.scaled_dict:
+            width, height = self.image.get_size()
+            self.scaled_dict[scale] = pg.transform.scale(
+                self.image, (width * scale, height * scale))
+
+        return self.scaled_dict[scale]
+
+    def get_fit_scale(self, size, most=c.MINIMAP_MENU_SCALE):
+        """
+        Return the largest scale, up to most, at which the whole
+        minimap fits in size.
+        """
+        width, height = self.image.get_size()
+        scale = min(size[0] // width, size[1] // height, most)
+
+        return max(scale, 1)
+
+    def draw(self, surface, rect, scale, player, index):
+        """
+        Draw the part of the minimap around the player that fits in
+        rect, then mark the player and the sprites that index, the
+        level's SpatialIndex, finds in that part of the level.
+        """
+        image = self.get_scaled_image(scale)
+        area = pg.Rect((0, 0), rect.size)
+        area.center = self.get_marker_position(player, scale)
+        area.clamp_ip(image.get_rect())
+        offset = rect.x - area.x, rect.y - area.y
+
+        surface.fill(c.BLACK, rect)
+        visible = area.clip(image.get_rect())
+        surface.blit(image, visible.move(offset), visible)
+
+        level_area = pg.Rect(area.x * 32 // scale, area.y * 32 // scale,
+                             area.width * 32 // scale + 32,
+                             area.height * 32 // scale + 32)
+        for sprite in index.query(level_area):
+            if sprite is not player:
+                self.draw_marker(surface, rect, sprite, scale, offset,
+                                 c.MINIMAP_SPRITE_COLOR)
+        self.draw_marker(surface, rect, player, scale, offset,
+                         c.MINIMAP_PLAYER_COLOR)
+
+    def get_marker_position(self, sprite, scale):
+        """
+        Return the position of a sprite on the minimap at scale.
+        """
+        x, y = sprite.rect.center
+        return x * scale // 32, y * scale // 32
+
+    def draw_marker(self, surface, rect, sprite, scale, offset, color):
+        """
+        Mark a sprite with a dot, if it is inside rect.
+        """
+        x, y = self.get_marker_position(sprite, scale)
+        size = max(scale, c.MINIMAP_MARKER_SIZE)
+        marker = pg.Rect(0, 0, size, size)
+        marker.center = x + offset[0], y + offset[1]
+        if rect.contains(marker):
+            surface.fill(color, marker)
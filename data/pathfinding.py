@@ -0,0 +1,167 @@
+"""
+Pathfinding over a level's TileGrid.  A* finds single routes.
+Distance fields give every tile's step count to a shared goal, so any
+number of sprites heading for (or away from) the same tile can pick
+their next step with a few array lookups.
+"""
+import heapq
+from collections import OrderedDict
+import numpy as np
+from . import constants as c
+
+
+class Pathfinder(object):
+    """
+    Routes and cached distance fields for one level.  Fields only
+    depend on static geometry, so they are dropped when the grid's
+    version changes and never because sprites moved.
+    """
+    def __init__(self, grid):
+        self.grid = grid
+        self.version = grid.version
+        self.field_dict = OrderedDict()
+        self.vector_dict = self.make_vector_dict()
+
+    def make_vector_dict(self):
+        """
+        Make a dictionary of tile offsets keyed by direction.
+        """
+        vector_dict = {'up': (0, -1),
+                       'down': (0, 1),
+                       'left': (-1, 0),
+                       'right': (1, 0)}
+
+        return vector_dict
+
+    def get_neighbors(self, tile):
+        """
+        Return the walkable tiles next to a tile.
+        """
+        tile_x, tile_y = tile
+        neighbors = []
+
+        for dx, dy in self.vector_dict.values():
+            if not self.grid.is_blocked(tile_x + dx, tile_y + dy):
+                neighbors.append((tile_x + dx, tile_y + dy))
+
+        return neighbors
+
+    def find_path(self, start, goal):
+        """
+        Return the list of tiles from start to goal, not including
+        start, or None if goal can't be reached.
+        """
+        if start == goal:
+            return []
+        if self.grid.is_blocked(*goal):
+            return None
+
+        def heuristic(tile):
+            return abs(tile[0] - goal[0]) + abs(tile[1] - goal[1])
+
+        count = 0
+        open_list = [(heuristic(start), count, start)]
+        came_from = {start: None}
+        cost_dict = {start: 0}
+
+        while open_list:
+            _, _, tile = heapq.heappop(open_list)
+            if tile == goal:
+                path = []
+                while tile != start:
+                    path.append(tile)
+                    tile = came_from[tile]
+                path.reverse()
+                return path
+
+            cost = cost_dict[tile] + 1
+            for neighbor in self.get_neighbors(tile):
+                if cost < cost_dict.get(neighbor, cost + 1):
+                    cost_dict[neighbor] = cost
+                    came_from[neighbor] = tile
+                    count += 1
+                    heapq.heappush(open_list,
+                                   (cost + heuristic(neighbor), count, neighbor))
+
+        return None
+
+    def get_distance_field(self, goal):
+        """
+        Return an array, indexed [x, y], of the number of steps from
+        each tile to goal.  Tiles that can't reach goal are -1.
+        """
+        if self.version != self.grid.version:
+            self.field_dict.clear()
+            self.version = self.grid.version
+
+        if goal in self.field_dict:
+            field = self.field_dict.pop(goal)
+        else:
+            field = self.make_distance_field(goal)
+            if len(self.field_dict) >= c.DISTANCE_FIELD_CACHE:
+                self.field_dict.popitem(last=False)
+
+        self.field_dict[goal] = field
+        return field
+
+    def make_distance_field(self, goal):
+        """
+        Breadth first search out from goal, one whole wavefront of
+        tiles per pass.
+        """
+        grid = self.grid
+        field = np.full((grid.width, grid.height), -1, np.int32)
+        if grid.is_blocked(*goal):
+            return field
+
+        walkable = grid.blocked == 0
+        frontier = np.zeros_like(walkable)
+        frontier[goal] = True
+        field[goal] = 0
+        distance = 0
+
+        while frontier.any():
+            distance += 1
+            spread = np.zeros_like(walkable)
+            spread[1:, :] |= frontier[:-1, :]
+            spread[:-1, :] |= frontier[1:, :]
+            spread[:, 1:] |= frontier[:, :-1]
+            spread[:, :-1] |= frontier[:, 1:]
+            spread &= walkable
+            spread &= field < 0
+            field[spread] = distance
+            frontier = spread
+
+        return field
+
+    def get_step(self, tile, goal, flee=False):
+        """
+        Return the direction of the neighbor that is closest to goal
+        (or, fleeing, furthest from it), or None if no neighbor is
+        better than staying put.
+        """
+        field = self.get_distance_field(goal)
+        tile_x, tile_y = tile
+        best = self.get_distance(field, tile)
+        if best < 0:
+            return None
+
+        step = None
+        for direction, (dx, dy) in self.vector_dict.items():
+            distance = self.get_distance(field, (tile_x + dx, tile_y + dy))
+            if distance < 0:
+                continue
+            if (flee and distance > best) or (not flee and distance < best):
+                best = distance
+                step = direction
+
+        return step
+
+    def get_distance(self, field, tile):
+        """
+        Return the distance stored for a tile, or -1 if it is off the map.
+        """
+        tile_x, tile_y = tile
+        if 0 <= tile_x < self.grid.width and 0 <= tile_y < self.grid.height:
+            return field[tile_x, tile_y]
+        return -1
@@ -0,0 +1,102 @@
+"""
+Background preparation of the maps a level's portals lead to.
+Only the work that needs no display is done on the worker thread:
+parsing the TMX file and decoding its tileset images.  Converting the
+tiles for the screen is left to the main thread when the map is
+actually loaded.
+"""
+import sys
+import threading
+from . import pytmx
+from . import constants as c
+
+#Python 2/3 compatibility.
+if sys.version_info[0] == 2:
+    import Queue as queue
+else:
+    import queue
+
+
+class Prefetcher(object):
+    """
+    Parses maps on a daemon thread and holds the results, up to a byte
+    budget of decoded tileset images, until they are taken.
+    """
+    def __init__(self, budget=c.PREFETCH_BUDGET):
+        self.budget = budget
+        self.lock = threading.Lock()
+        self.queue = queue.Queue()
+        self.thread = None
+        self.wanted = set()
+        self.prepared_dict = {}
+
+    def request(self, files):
+        """
+        Prepare files, a list of (key, filename) pairs, in the
+        background.  Maps prepared for an earlier request that aren't
+        wanted any more are dropped.
+        """
+        with self.lock:
+            self.wanted = set(key for key, filename in files)
+            for key in list(self.prepared_dict):
+                if key not in self.wanted:
+                    del self.prepared_dict[key]
+
+        for key, filename in files:
+            self.queue.put((key, filename))
+
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.work)
+            self.thread.daemon = True
+            self.thread.start()
+
+    def take(self, key):
+        """
+        Return the prepared (tmx_data, tileset_images) for a key and
+        forget them, or None if the map isn't ready.
+        """
+        with self.lock:
+            prepared = self.prepared_dict.pop(key, None)
+
+        if prepared:
+            return prepared[:2]
+
+    def work(self):
+        """
+        Prepare requested maps one at a time, forever.
+        """
+        while True:
+            key, filename = self.queue.get()
+            with self.lock:
+                skip = key not in self.wanted or key in self.prepared_dict
+            if skip:
+                continue
+
+            try:
+                prepared = self.prepare(filename)
+            except Exception:
+                #Loading the map on the main thread will raise it properly.
+                continue
+
+            with self.lock:
+                if key in self.wanted and \
+                        self.get_size() + prepared[2] <= self.budget:
+                    self.prepared_dict[key] = prepared
+
+    def prepare(self, filename):
+        """
+        Parse a map and decode its tilesets.  Return the parsed map, the
+        decoded images and their size in bytes.
+        """
+        tmx_data = pytmx.TiledMap(filename)
+        images = pytmx.load_tileset_images(tmx_data)
+        size = sum(image.get_width() * image.get_height() * image.get_bytesize()
+                   for image in images.values())
+
+        return tmx_data, images, size
+
+    def get_size(self):
+        """
+        Return the bytes of decoded images held.  Call with the lock.
+        """
+        return sum(prepared[2] for prepared in self.prepared_dict.values())
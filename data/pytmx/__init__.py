@@ -1,5 +1,5 @@
-from data.pytmx.tmxloader import load_pygame, load_tmx
-from data.pytmx.utils import buildDistributionRects
+from data.pytmx.tmxloader import load_pygame, load_tmx, load_tileset_images
+from data.pytmx.utils import buildDistributionRects, simplify_mask
 from data.pytmx.pytmx import *
 
 __version__ = '2.16.4'
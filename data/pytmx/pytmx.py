@@ -48,6 +48,7 @@ class TiledMap(TiledElement):
         self.objectgroups = []  # list of TiledObjectGroup objects
         self.all_layers = []  # list of all layers in proper order
         self.tile_properties = {}  # dict of tiles that have metadata
+        self.tile_animations = {}  # dict of gid: [(frame gid, duration), ...]
         self.filename = filename
 
         self.layernames = {}
@@ -460,10 +461,29 @@ class TiledTileset(TiledElement):
             for gid, flags in self.parent.map_gid(real_gid + self.firstgid):
                 self.parent.setTileProperties(gid, p)
 
+            animation_node = child.find('animation')
+            if animation_node is not None:
+                self.parse_animation(real_gid, animation_node)
+
         image_node = node.find('image')
         self.source = image_node.get('source')
         self.trans = image_node.get("trans", None)
 
+    def parse_animation(self, real_gid, node):
+        """
+        parse the frames of an animated tile.  frame tiles are registered
+        with the same flags as each copy of the animated tile, so flipped
+        tiles animate flipped.
+        """
+        frames = [ (int(frame.get('tileid')) + self.firstgid,
+                    int(frame.get('duration')))
+                   for frame in node.findall('frame') ]
+
+        for gid, flags in list(self.parent.map_gid(real_gid + self.firstgid)):
+            self.parent.tile_animations[gid] = [
+                (self.parent.register_gid(frame_gid, flags), duration)
+                for frame_gid, duration in frames ]
+
 
 class TiledLayer(TiledElement):
     reserved = "visible name x y width height opacity properties data".split()
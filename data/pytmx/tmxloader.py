@@ -7,7 +7,7 @@ from data.pytmx import pytmx
 from .constants import *
 
 
-__all__ = ['load_pygame', 'load_tmx']
+__all__ = ['load_pygame', 'load_tmx', 'load_tileset_images']
 
 
 def handle_transformation(tile, flags):
@@ -120,12 +120,18 @@ def _load_images_pygame(tmxdata, mapping, *args, **kwargs):
     if tmxdata.background_color:
         tmxdata.background_color = pygame.Color(tmxdata.background_color)
 
+    # tileset images already decoded by load_tileset_images
+    tileset_images = kwargs.get("tileset_images", {})
+
     # initialize the array of images
     tmxdata.images = [0] * tmxdata.maxgid
 
     for ts in tmxdata.tilesets:
         path = os.path.join(os.path.dirname(tmxdata.filename), ts.source)
-        image = pygame.image.load(path)
+        if path in tileset_images:
+            image = tileset_images[path]
+        else:
+            image = pygame.image.load(path)
         w, h = image.get_size()
 
         # margins and spacing
@@ -182,13 +188,32 @@ def _load_images_pygame(tmxdata, mapping, *args, **kwargs):
                 tmxdata.images.append(image)
 
 
+def load_tileset_images(tmxdata):
+    """
+    Decode the tileset images of a parsed map, without converting them.
+
+    Needs no display, so it can be done ahead of time on another thread.
+    Pass the result to load_pygame as tileset_images.
+    """
+    images = {}
+    for ts in tmxdata.tilesets:
+        path = os.path.join(os.path.dirname(tmxdata.filename), ts.source)
+        if path not in images:
+            images[path] = pygame.image.load(path)
+
+    return images
+
+
 def load_pygame(filename, *args, **kwargs):
     """
     PYGAME USERS: Use me.
 
     Load a TMX file, load the images, and return a TiledMap class that is ready to use.
+    An already parsed TiledMap can be passed as tmxdata.
     """
-    tmxdata = pytmx.TiledMap(filename)
+    tmxdata = kwargs.pop("tmxdata", None)
+    if tmxdata is None:
+        tmxdata = pytmx.TiledMap(filename)
     _load_images_pygame(tmxdata, None, *args, **kwargs)
     return tmxdata
 
@@ -1,7 +1,8 @@
-from itertools import tee, islice, izip, product
+from itertools import tee, islice, izip
 from collections import defaultdict
 
 from pygame import Rect
+import numpy as np
 
 from .constants import *
 
@@ -146,26 +147,18 @@ def buildDistributionRects(tmxmap, layer, tileset=None, real_gid=None):
             msg = "Layer \"{0}\" not found in map {1}."
             raise ValueError, msg.format(layer, tmxmap)
 
-    p = product(xrange(tmxmap.width), xrange(tmxmap.height))
+    data = np.array(layer_data)
     if gid:
-        points = [ (x,y) for (x,y) in p if layer_data[y][x] == gid ]
+        mask = data == gid
     else:
-        points = [ (x,y) for (x,y) in p if layer_data[y][x] ]
+        mask = data != 0
 
-    rects = simplify(points, tmxmap.tilewidth, tmxmap.tileheight)
+    rects = simplify_mask(mask, tmxmap.tilewidth, tmxmap.tileheight)
     return rects
 
 
 def simplify(all_points, tilewidth, tileheight):
     """
-    kludge:
-
-    "A kludge (or kluge) is a workaround, a quick-and-dirty solution,
-    a clumsy or inelegant, yet effective, solution to a problem, typically
-    using parts that are cobbled together."
-
-    -- wikipedia
-
     turn a list of points into a rects
     adjacent rects will be combined.
 
@@ -194,51 +187,61 @@ def simplify(all_points, tilewidth, tileheight):
 
         pretty cool, right?
 
-    there may be cases where the number of rectangles is not as low as possible,
-    but I haven't found that it is excessively bad.  certainly much better than
+    the merge is greedy (see simplify_mask), so there may be cases where the
+    number of rectangles is not as low as possible, but it is never
+    excessively bad.  certainly much better than
     making a list of rects, one for each tile on the map!
 
     """
 
-    def pick_rect(points, rects):
-        ox, oy = sorted([ (sum(p), p) for p in points ])[0][1]
-        x = ox
-        y = oy
-        ex = None
+    if not all_points:
+        return []
 
-        while 1:
-            x += 1
-            if not (x, y) in points:
-                if ex is None:
-                    ex = x - 1
+    xs = np.array([ p[0] for p in all_points ])
+    ys = np.array([ p[1] for p in all_points ])
 
-                if ((ox, y+1) in points):
-                    if x == ex + 1 :
-                        y += 1
-                        x = ox
+    # points may be negative, so build the mask from the top-left point
+    left = xs.min()
+    top = ys.min()
+    mask = np.zeros((ys.max() - top + 1, xs.max() - left + 1), np.bool_)
+    mask[ys - top, xs - left] = True
 
-                    else:
-                        y -= 1
-                        break
-                else:
-                    if x <= ex: y-= 1
-                    break
+    rects = simplify_mask(mask, tilewidth, tileheight)
+    return [ r.move(left*tilewidth, top*tileheight) for r in rects ]
 
-        c_rect = Rect(ox*tilewidth,oy*tileheight,\
-                     (ex-ox+1)*tilewidth,(y-oy+1)*tileheight)
 
-        rects.append(c_rect)
-
-        rect = Rect(ox,oy,ex-ox+1,y-oy+1)
-        kill = [ p for p in points if rect.collidepoint(p) ]
-        [ points.remove(i) for i in kill ]
+def simplify_mask(mask, tilewidth, tileheight):
+    """
+    greedy rect merge over a mask of tiles, indexed as mask[y][x].
 
-        if points:
-            pick_rect(points, rects)
+    rows are scanned top to bottom.  each uncovered tile found starts a
+    rect that is stretched right as far as the row allows, then down for
+    as long as every tile under it is set.  covered tiles are cleared
+    from the mask so each tile ends up in exactly one rect.
+    """
 
+    mask = np.array(mask, np.bool_)
+    height, width = mask.shape
     rect_list = []
-    while all_points:
-        pick_rect(all_points, rect_list)
 
-    return rect_list
+    for y in xrange(height):
+        row = mask[y]
+        while row.any():
+            ox = int(row.argmax())
+
+            # stretch right: first unset tile after ox ends the run
+            run = row[ox:]
+            ex = ox + (int(run.argmin()) if not run.all() else len(run))
+
+            # stretch down: first row that is not solid under the run ends it
+            below = mask[y+1:, ox:ex].all(axis=1)
+            if below.all():
+                ey = height
+            else:
+                ey = y + 1 + int(below.argmin())
 
+            mask[y:ey, ox:ex] = False
+            rect_list.append(Rect(ox*tilewidth, y*tileheight,
+                                  (ex-ox)*tilewidth, (ey-y)*tileheight))
+
+    return rect_list
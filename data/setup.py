@@ -7,7 +7,7 @@ creates dictionaries of resources.
 
 import os
 import pygame as pg
-from . import tools
+from . import tools, variants
 from . import constants as c
 
 GAME = 'BEGIN GAME'
@@ -24,8 +24,10 @@ SCREEN_RECT = SCREEN.get_rect()
 FONTS = tools.load_all_fonts(os.path.join('resources', 'fonts'))
 MUSIC = tools.load_all_music(os.path.join('resources', 'music'))
 GFX = tools.load_all_gfx(os.path.join('resources', 'graphics'))
+GFX.update(variants.make_variant_sheets(GFX))
 SFX = tools.load_all_sfx(os.path.join('resources', 'sound'))
 TMX = tools.load_all_tmx(os.path.join('resources', 'tmx'))
+WORLDS = tools.load_all_worlds(os.path.join('resources', 'tmx'))
 
 FONT = pg.font.Font(FONTS['Fixedsys500c'], 20)
 
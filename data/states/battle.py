@@ -3,8 +3,8 @@ monsters"""
 import random, sys
 from itertools import izip
 import pygame as pg
-from .. import tools, battlegui, observer, setup
-from .. components import person, attack, attackitems
+from .. import tools, battlegui, observer, setup, variants
+from .. components import person, attack, attackitems, particles
 from .. import constants as c
 
 
@@ -33,21 +33,24 @@ class Battle(tools._State):
         self.next = game_data['last state']
         self.run_away = False
 
-        self.player = self.make_player()
+        scene = PREPARER.take(game_data, self.previous)
+        if scene.first_battle:
+            self.game_data['start of game'] = False
+
+        self.player = scene.player
         self.attack_animations = pg.sprite.Group()
+        self.particles = particles.ParticleSystem()
         self.sword = attackitems.Sword(self.player)
-        self.enemy_group, self.enemy_pos_list, self.enemy_list = self.make_enemies()
-        self.experience_points = self.get_experience_points()
-        self.new_gold = self.get_new_gold()
-        self.background = self.make_background()
-        self.info_box = battlegui.InfoBox(game_data, 
-                                          self.experience_points, 
-                                          self.new_gold)
-        self.arrow = battlegui.SelectArrow(self.enemy_pos_list,
-                                           self.info_box)
-        self.select_box = battlegui.SelectBox()
-        self.player_health_box = battlegui.PlayerHealth(self.select_box.rect,
-                                                        self.game_data)
+        self.enemy_group = scene.enemy_group
+        self.enemy_pos_list = scene.enemy_pos_list
+        self.enemy_list = scene.enemy_list
+        self.experience_points = scene.experience_points
+        self.new_gold = scene.new_gold
+        self.background = scene.background
+        self.info_box = scene.info_box
+        self.arrow = scene.arrow
+        self.select_box = scene.select_box
+        self.player_health_box = scene.player_health_box
 
         self.select_action_state_dict = self.make_selection_state_dict()
         self.observers = [observer.Battle(self),
@@ -77,110 +80,6 @@ class Battle(tools._State):
 
         return action_dict
 
-    def make_enemy_level_dict(self):
-        new_dict = {c.OVERWORLD: 1,
-                    c.DUNGEON: 2,
-                    c.DUNGEON2: 2,
-                    c.DUNGEON3: 2,
-                    c.DUNGEON4: 2,
-                    c.DUNGEON5: 4}
-
-        return new_dict
-
-    def set_enemy_level(self, enemy_list):
-        dungeon_level_dict = self.make_enemy_level_dict()
-
-        for enemy in enemy_list:
-            enemy.level = dungeon_level_dict[self.previous]
-
-    def get_experience_points(self):
-        """
-        Calculate experience points based on number of enemies
-        and their levels.
-        """
-        experience_total = 0
-
-        for enemy in self.enemy_list:
-            experience_total += (random.randint(5,10))
-
-        return experience_total
-
-    def get_new_gold(self):
-        """
-        Calculate the gold collected at the end of the battle.
-        """
-        gold = 0
-
-        for enemy in self.enemy_list:
-            max_gold = enemy.level * 20
-            gold += (random.randint(1, max_gold))
-
-        return gold
-
-    def make_background(self):
-        """
-        Make the blue/black background.
-        """
-        background = pg.sprite.Sprite()
-        surface = pg.Surface(c.SCREEN_SIZE).convert()
-        surface.fill(c.BLACK_BLUE)
-        background.image = surface
-        background.rect = background.image.get_rect()
-        background_group = pg.sprite.Group(background)
-
-        return background_group
-
-    def make_enemies(self):
-        """
-        Make the enemies for the battle. Return sprite group.
-        """
-        pos_list = []
-
-        for column in range(3):
-            for row in range(3):
-                x = (column * 100) + 100
-                y = (row * 100) + 100
-                pos_list.append([x, y])
-
-        enemy_group = pg.sprite.Group()
-
-        if self.game_data['battle type']:
-            enemy = person.Enemy('evilwizard', 0, 0,
-                                  'down', 'battle resting')
-            enemy_group.add(enemy)
-        else:
-            if self.game_data['start of game']:
-                for enemy in range(3):
-                    enemy_group.add(person.Enemy('devil', 0, 0,
-                                                 'down', 'battle resting'))
-                self.game_data['start of game'] = False
-            else:
-                for enemy in range(random.randint(1, 6)):
-                    enemy_group.add(person.Enemy('devil', 0, 0,
-                                                  'down', 'battle resting'))
-
-        for i, enemy in enumerate(enemy_group):
-            enemy.rect.topleft = pos_list[i]
-            enemy.image = pg.transform.scale2x(enemy.image)
-            enemy.index = i
-            enemy.level = self.make_enemy_level_dict()[self.previous]
-            if enemy.name == 'evilwizard':
-                enemy.health = 100
-            else:
-                enemy.health = enemy.level * 4
-
-        enemy_list = [enemy for enemy in enemy_group]
-
-        return enemy_group, pos_list[0:len(enemy_group)], enemy_list
-
-    def make_player(self):
-        """
-        Make the sprite for the player's character.
-        """
-        player = person.Player('left', self.game_data, 630, 220, 'battle resting', 1)
-        player.image = pg.transform.scale2x(player.image)
-        return player
-
     def make_selection_state_dict(self):
         """
         Make a dictionary of states with arrow coordinates as keys.
@@ -201,6 +100,7 @@ class Battle(tools._State):
         self.enemy_group.update(current_time)
         self.player.update(keys, current_time)
         self.attack_animations.update()
+        self.particles.update(current_time)
         self.info_box.update()
         self.arrow.update(keys)
         self.sword.update(current_time)
@@ -410,6 +310,7 @@ class Battle(tools._State):
         self.background.draw(surface)
         self.enemy_group.draw(surface)
         self.attack_animations.draw(surface)
+        self.particles.draw(surface)
         self.sword.draw(surface)
         surface.blit(self.player.image, self.player.rect)
         surface.blit(self.info_box.image, self.info_box.rect)
@@ -512,6 +413,7 @@ class Battle(tools._State):
             posy = enemy.rect.y - 64
             fire_sprite = attack.Fire(posx, posy)
             self.attack_animations.add(fire_sprite)
+            self.make_fire_particles(enemy.rect.center)
             if enemy.health <= 0:
                 enemy.kill()
                 self.arrow.remove_pos(enemy)
@@ -523,6 +425,20 @@ class Battle(tools._State):
         self.arrow.state = 'invisible'
         self.set_timer_to_current_time()
 
+    def make_fire_particles(self, pos):
+        """
+        Make a burst of rising embers around pos.
+        """
+        self.particles.emit(pos, 500, (255, 140, 0), 220, 900, -150)
+        self.particles.emit(pos, 250, (255, 220, 80), 160, 700, -200)
+        self.particles.emit(pos, 250, (255, 40, 0), 260, 1000, -100)
+
+    def make_sparkle_particles(self, color):
+        """
+        Make slowly rising sparkles around the player.
+        """
+        self.particles.emit(self.player.rect.center, 300, color, 90, 1200, -60)
+
     def cast_cure(self):
         """
         Cast cure spell on player.
@@ -536,6 +452,7 @@ class Battle(tools._State):
         self.enemy_index = 0
         self.damage_points.add(
             attackitems.HealthPoints(HEAL_AMOUNT, self.player.rect.topright, False))
+        self.make_sparkle_particles(c.GREEN)
         self.player_healed(HEAL_AMOUNT, MAGIC_POINTS)
         self.info_box.state = c.DRINK_HEALING_POTION
         self.notify(c.POWERUP)
@@ -622,6 +539,7 @@ class Battle(tools._State):
             attackitems.HealthPoints(30,
                                      self.player.rect.topright,
                                      False))
+        self.make_sparkle_particles(c.GREEN)
         self.player_healed(30)
         self.notify(c.POWERUP)
 
@@ -638,6 +556,7 @@ class Battle(tools._State):
                                      self.player.rect.topright,
                                      False,
                                      True))
+        self.make_sparkle_particles(c.PINK)
         self.magic_boost(30)
         self.set_timer_to_current_time()
         self.notify(c.POWERUP)
@@ -765,10 +684,236 @@ class Battle(tools._State):
                     self.action_selected = False
 
 
+class BattleScene(object):
+    """
+    The parts of a battle that are settled before it is played: the
+    rolled enemies and rewards, the sprites, background and GUI boxes.
+    A scene can be built a step at a time ahead of the battle.
+    """
+    def __init__(self, game_data, previous):
+        self.game_data = game_data
+        self.previous = previous
+        self.battle_type = game_data['battle type']
+        self.first_battle = game_data['start of game']
+        self.steps = [self.make_sprites,
+                      self.roll_rewards,
+                      self.make_gui,
+                      attack.get_fire_frames]
+
+    def fits(self, game_data, previous):
+        """
+        Return True if the scene was rolled for this battle.
+        """
+        return (self.game_data is game_data and
+                self.previous == previous and
+                self.battle_type == game_data['battle type'] and
+                self.first_battle == game_data['start of game'])
+
+    def build_step(self):
+        """
+        Do the next build step, if any are left.
+        """
+        if self.steps:
+            self.steps.pop(0)()
+
+    def build(self):
+        """
+        Do every build step left.
+        """
+        while self.steps:
+            self.build_step()
+
+    def make_sprites(self):
+        """
+        Make the player and roll the enemies.
+        """
+        self.player = self.make_player()
+        self.enemy_group, self.enemy_pos_list, self.enemy_list = self.make_enemies()
+
+    def roll_rewards(self):
+        """
+        Roll the experience and gold the battle is worth.
+        """
+        self.experience_points = self.get_experience_points()
+        self.new_gold = self.get_new_gold()
+
+    def make_gui(self):
+        """
+        Make the background and GUI boxes.
+        """
+        self.background = self.make_background()
+        self.info_box = battlegui.InfoBox(self.game_data,
+                                          self.experience_points,
+                                          self.new_gold)
+        self.arrow = battlegui.SelectArrow(self.enemy_pos_list,
+                                           self.info_box)
+        self.select_box = battlegui.SelectBox()
+        self.player_health_box = battlegui.PlayerHealth(self.select_box.rect,
+                                                        self.game_data)
+
+    def update_item_text(self):
+        """
+        Remake the item and magic lists, which can change between
+        building the scene and the battle starting.
+        """
+        self.info_box.item_text_list = self.info_box.make_item_text()[1:]
+        self.info_box.magic_text_list = self.info_box.make_magic_text()[1:]
+
+    def make_enemy_level_dict(self):
+        new_dict = {c.OVERWORLD: 1,
+                    c.DUNGEON: 2,
+                    c.DUNGEON2: 2,
+                    c.DUNGEON3: 2,
+                    c.DUNGEON4: 2,
+                    c.DUNGEON5: 4}
+
+        return new_dict
+
+    def make_enemy_type_dict(self):
+        """
+        Make a dictionary of the enemy types that appear in each area.
+        """
+        new_dict = {c.OVERWORLD: ['devil', 'swamp devil'],
+                    c.DUNGEON: ['devil', 'frost devil'],
+                    c.DUNGEON2: ['devil', 'frost devil'],
+                    c.DUNGEON3: ['devil', 'frost devil', 'swamp devil'],
+                    c.DUNGEON4: ['frost devil', 'swamp devil'],
+                    c.DUNGEON5: ['frost devil', 'shadow devil']}
+
+        return new_dict
+
+    def set_enemy_level(self, enemy_list):
+        dungeon_level_dict = self.make_enemy_level_dict()
 
+        for enemy in enemy_list:
+            enemy.level = dungeon_level_dict[self.previous]
 
+    def get_experience_points(self):
+        """
+        Calculate experience points based on number of enemies
+        and their levels.
+        """
+        experience_total = 0
 
+        for enemy in self.enemy_list:
+            experience_total += (random.randint(5,10))
+
+        return experience_total
 
+    def get_new_gold(self):
+        """
+        Calculate the gold collected at the end of the battle.
+        """
+        gold = 0
+
+        for enemy in self.enemy_list:
+            max_gold = enemy.level * 20
+            gold += (random.randint(1, max_gold))
+
+        return gold
+
+    def make_background(self):
+        """
+        Make the blue/black background.
+        """
+        background = pg.sprite.Sprite()
+        surface = pg.Surface(c.SCREEN_SIZE).convert()
+        surface.fill(c.BLACK_BLUE)
+        background.image = surface
+        background.rect = background.image.get_rect()
+        background_group = pg.sprite.Group(background)
+
+        return background_group
+
+    def make_enemies(self):
+        """
+        Make the enemies for the battle. Return sprite group.
+        """
+        pos_list = []
+
+        for column in range(3):
+            for row in range(3):
+                x = (column * 100) + 100
+                y = (row * 100) + 100
+                pos_list.append([x, y])
+
+        enemy_group = pg.sprite.Group()
+
+        if self.game_data['battle type']:
+            enemy = person.Enemy('evilwizard', 0, 0,
+                                  'down', 'battle resting')
+            enemy_group.add(enemy)
+        else:
+            if self.first_battle:
+                for enemy in range(3):
+                    enemy_group.add(person.Enemy('devil', 0, 0,
+                                                 'down', 'battle resting'))
+            else:
+                enemy_types = self.make_enemy_type_dict()[self.previous]
+                for enemy in range(random.randint(1, 6)):
+                    enemy_group.add(person.Enemy(random.choice(enemy_types),
+                                                 0, 0, 'down', 'battle resting'))
+
+        variant_dict = variants.make_variant_dict()
+
+        for i, enemy in enumerate(enemy_group):
+            stats = variant_dict.get(enemy.name, {})
+            enemy.rect.topleft = pos_list[i]
+            enemy.image = pg.transform.scale2x(enemy.image)
+            enemy.index = i
+            enemy.level = self.make_enemy_level_dict()[self.previous]
+            enemy.level += stats.get('level bonus', 0)
+            if enemy.name == 'evilwizard':
+                enemy.health = 100
+            else:
+                enemy.health = enemy.level * 4 + stats.get('health bonus', 0)
+
+        enemy_list = [enemy for enemy in enemy_group]
+
+        return enemy_group, pos_list[0:len(enemy_group)], enemy_list
+
+    def make_player(self):
+        """
+        Make the sprite for the player's character.
+        """
+        player = person.Player('left', self.game_data, 630, 220, 'battle resting', 1)
+        player.image = pg.transform.scale2x(player.image)
+        return player
+
+
+class BattlePreparer(object):
+    """
+    Builds the next random battle's scene a step per frame while the
+    battle counter runs down, so that the battle starts without a
+    stall.
+    """
+    def __init__(self):
+        self.scene = None
+
+    def update(self, game_data, level_name):
+        """
+        Build a step of the next battle's scene if the battle counter
+        is low.
+        """
+        if game_data['battle counter'] > c.BATTLE_PREPARE_COUNTER:
+            return
+
+        if self.scene is None or not self.scene.fits(game_data, level_name):
+            self.scene = BattleScene(game_data, level_name)
+        self.scene.build_step()
+
+    def take(self, game_data, previous):
+        """
+        Return the prepared scene if it was rolled for this battle,
+        otherwise a new one, finished and ready to use.
+        """
+        scene, self.scene = self.scene, None
+        if scene is None or not scene.fits(game_data, previous):
+            scene = BattleScene(game_data, previous)
+        scene.build()
+        scene.update_item_text()
 
+        return scene
 
 
+PREPARER = BattlePreparer()
@@ -5,14 +5,19 @@ differentiated by self.name and self.tmx_map.
 This class inherits from the generic state class
 found in the tools.py module.
 """
-import copy, sys
+import sys
+from itertools import product
+import numpy as np
 import pygame as pg
-from .. import tools, collision
+from .. import tools, collision, drawlist, triggers, pathfinding, compositor
+from .. import lighting, minimap
 from .. import constants as c
 from .. components import person, textbox, portal
 from . import player_menu
-from .. import tilerender
+from . import battle
+from .. import mapcache
 from .. import setup
+from .. import pytmx
 
 
 #Python 2/3 compatibility.
@@ -45,28 +50,55 @@ class LevelState(tools._State):
         self.use_portal = False
         self.allow_input = False
         self.cut_off_bottom_map = ['castle', 'town', 'dungeon']
-        self.renderer = tilerender.Renderer(self.tmx_map)
-        self.map_image = self.renderer.make_2x_map()
+        self.renderer = mapcache.CACHE.get_renderer(self.tmx_map)
+        self.tile_map = self.make_tile_map()
 
-        self.viewport = self.make_viewport(self.map_image)
-        self.level_surface = self.make_level_surface(self.map_image)
-        self.level_rect = self.level_surface.get_rect()
+        self.map_rect = self.make_map_rect()
+        self.viewport = self.make_viewport(self.map_rect)
+        self.level_rect = self.make_level_rect(self.map_rect)
         self.portals = self.make_level_portals()
         self.player = self.make_player()
         self.blockers = self.make_blockers()
+        self.grid = self.make_grid()
+        self.pathfinder = pathfinding.Pathfinder(self.grid)
+        self.minimap = self.make_minimap()
         self.sprites = self.make_sprites()
+        self.draw_list = self.make_draw_list()
+        self.lighting = self.make_lighting()
+        self.compositor = compositor.Compositor(self.tile_map, self.draw_list,
+                                                c.NATIVE_RESOLUTION,
+                                                self.lighting)
+        self.trigger_map = self.make_trigger_map()
 
         self.collision_handler = collision.CollisionHandler(self.player,
-                                                            self.blockers,
+                                                            self.grid,
                                                             self.sprites,
-                                                            self.portals,
-                                                            self)
+                                                            self.trigger_map,
+                                                            self,
+                                                            self.draw_list)
         self.dialogue_handler = textbox.TextHandler(self)
         self.state_dict = self.make_state_dict()
         self.menu_screen = player_menu.Player_Menu(game_data, self)
         self.transition_rect = setup.SCREEN.get_rect()
         self.transition_alpha = 255
 
+    def resume(self, current_time, game_data):
+        """
+        Call when flipped back to after a battle.  The map, sprites and
+        handlers built in startup are kept; only what a battle can
+        change is reset, and sprites are refreshed from game data.
+        """
+        self.game_data = game_data
+        self.music, self.volume = self.set_music()
+        self.current_time = current_time
+        self.state = 'transition_in'
+        self.switch_to_battle = False
+        self.use_portal = False
+        self.allow_input = False
+        self.dialogue_handler.allow_input = False
+        self.transition_alpha = 255
+        self.refresh_sprites()
+
     def set_music(self):
         """
         Set music based on name.
@@ -93,26 +125,41 @@ class LevelState(tools._State):
         else:
             return None, None
 
-    def make_viewport(self, map_image):
+    def make_tile_map(self):
+        """
+        Make the map drawn under the level's sprites.
+        """
+        return mapcache.CACHE.get_chunked_map(self.tmx_map)
+
+    def get_object_properties(self):
+        """
+        Return the property dictionaries of the map's objects.
+        """
+        return [object.__dict__ for object in self.renderer.tmx_data.getObjects()]
+
+    def make_map_rect(self):
+        """
+        Make the rect of the whole map in level coordinates.
+        """
+        width, height = self.renderer.size
+        return pg.Rect(0, 0, width * 2, height * 2)
+
+    def make_viewport(self, map_rect):
         """
         Create the viewport to view the level through.
         """
-        map_rect = map_image.get_rect()
         return setup.SCREEN.get_rect(bottom=map_rect.bottom)
 
-    def make_level_surface(self, map_image):
+    def make_level_rect(self, map_rect):
         """
-        Create the surface all images are blitted to.
+        Make the rect the viewport is kept inside.  Some maps have their
+        bottom row cut off.
         """
-        map_rect = map_image.get_rect()
-        map_width = map_rect.width
+        level_rect = map_rect.copy()
         if self.name in self.cut_off_bottom_map:
-            map_height = map_rect.height - 32
-        else:
-            map_height = map_rect.height
-        size = map_width, map_height
+            level_rect.height -= 32
 
-        return pg.Surface(size).convert()
+        return level_rect
 
     def make_player(self):
         """
@@ -120,40 +167,52 @@ class LevelState(tools._State):
         """
         last_state = self.previous
 
-        if last_state == 'battle':
-            player = person.Player(self.game_data['last direction'], self.game_data)
-            player.rect.x = self.game_data['last location'][0] * 32
-            player.rect.y = self.game_data['last location'][1] * 32
-
-        else:
-            for object in self.renderer.tmx_data.getObjects():
-                properties = object.__dict__
-                if properties['name'] == 'start point':
-                    if last_state == properties['state']:
-                        posx = properties['x'] * 2
-                        posy = (properties['y'] * 2) - 32
-                        player = person.Player(properties['direction'],
-                                               self.game_data)
-                        player.rect.x = posx
-                        player.rect.y = posy
+        for properties in self.get_object_properties():
+            if properties['name'] == 'start point':
+                if last_state == properties['state']:
+                    posx = properties['x'] * 2
+                    posy = (properties['y'] * 2) - 32
+                    player = person.Player(properties['direction'],
+                                           self.game_data)
+                    player.rect.x = posx
+                    player.rect.y = posy
 
         return player
 
     def make_blockers(self):
         """
-        Make the blockers for the level.
+        Make the blockers for the level.  Blocker tiles are merged into
+        as few rects as possible.  The mask has a one tile border since
+        some blockers sit just off the edge of the map.
         """
-        blockers = []
+        tmx_data = self.renderer.tmx_data
+        mask = np.zeros((tmx_data.height + 2, tmx_data.width + 2), np.bool_)
 
-        for object in self.renderer.tmx_data.getObjects():
+        for object in tmx_data.getObjects():
             properties = object.__dict__
             if properties['name'] == 'blocker':
-                left = properties['x'] * 2
-                top = ((properties['y']) * 2) - 32
-                blocker = pg.Rect(left, top, 32, 32)
-                blockers.append(blocker)
+                tile_x = properties['x'] // 16
+                tile_y = (properties['y'] // 16) - 1
+                mask[tile_y + 1, tile_x + 1] = True
+
+        rects = pytmx.simplify_mask(mask, 32, 32)
 
-        return blockers
+        return [rect.move(-32, -32) for rect in rects]
+
+    def make_grid(self):
+        """
+        Make the tile grid used for wall collisions.
+        """
+        tmx_data = self.renderer.tmx_data
+        return collision.TileGrid(tmx_data.width, tmx_data.height,
+                                  self.blockers)
+
+    def make_minimap(self):
+        """
+        Make the level's minimap from its tiles and walls.
+        """
+        return minimap.Minimap(mapcache.CACHE.get_minimap(self.tmx_map,
+                                                          self.grid.blocked))
 
     def make_sprites(self):
         """
@@ -161,85 +220,152 @@ class LevelState(tools._State):
         """
         sprites = pg.sprite.Group()
 
-        for object in self.renderer.tmx_data.getObjects():
-            properties = object.__dict__
+        for properties in self.get_object_properties():
             if properties['name'] == 'sprite':
-                if 'direction' in properties:
-                    direction = properties['direction']
-                else:
-                    direction = 'down'
+                sprite = self.make_sprite(properties)
+                self.refresh_sprite(sprite)
+                if self.is_sprite_shown(sprite):
+                    sprites.add(sprite)
 
-                if properties['type'] == 'soldier' and direction == 'left':
-                    index = 1
-                else:
-                    index = 0
+        return sprites
 
-                if 'item' in properties:
-                    item = properties['item']
-                else:
-                    item = None
+    def make_sprite(self, properties):
+        """
+        Make a sprite from its tmx object properties.  The properties
+        are kept on the sprite so refresh_sprite can use them again.
+        """
+        if 'direction' in properties:
+            direction = properties['direction']
+        else:
+            direction = 'down'
 
-                if 'id' in properties:
-                    id = properties['id']
-                else:
-                    id = None
+        if properties['type'] == 'soldier' and direction == 'left':
+            index = 1
+        else:
+            index = 0
 
-                if 'battle' in properties:
-                    battle = properties['battle']
-                else:
-                    battle = None
+        if 'id' in properties:
+            id = properties['id']
+        else:
+            id = None
 
-                if 'state' in properties:
-                    sprite_state = properties['state']
-                else:
-                    sprite_state = None
-
-
-                x = properties['x'] * 2
-                y = ((properties['y']) * 2) - 32
-
-                sprite_dict = {'oldman': person.Person('oldman',
-                                                       x, y, direction),
-                               'bluedressgirl': person.Person('femalevillager',
-                                                              x, y, direction,
-                                                              'resting', 1),
-                               'femalewarrior': person.Person('femvillager2',
-                                                              x, y, direction,
-                                                              'autoresting'),
-                               'devil': person.Person('devil', x, y,
-                                                      'down', 'autoresting'),
-                               'oldmanbrother': person.Person('oldmanbrother',
-                                                              x, y, direction),
-                               'soldier': person.Person('soldier',
-                                                        x, y, direction,
-                                                        'resting', index),
-                               'king': person.Person('king', x, y, direction),
-                               'evilwizard': person.Person('evilwizard', x, y, direction),
-                               'treasurechest': person.Chest(x, y, id)}
-
-                sprite = sprite_dict[properties['type']]
-                if sprite_state:
-                    sprite.state = sprite_state
-
-                if sprite.name == 'oldman':
-                    if self.game_data['old man gift'] and not self.game_data['elixir received']:
-                        sprite.item = self.game_data['old man gift']
-                    else:
-                        sprite.item = item
-                elif sprite.name == 'king':
-                    if not self.game_data['talked to king']:
-                        sprite.item = self.game_data['king item']
-                else:
-                    sprite.item = item
-                sprite.battle = battle
-                self.assign_dialogue(sprite, properties)
-                self.check_for_opened_chest(sprite)
-                if sprite.name == 'evilwizard' and self.game_data['crown quest']:
-                    pass
+        if 'state' in properties:
+            sprite_state = properties['state']
+        else:
+            sprite_state = None
+
+
+        x = properties['x'] * 2
+        y = ((properties['y']) * 2) - 32
+
+        sprite_dict = {'oldman': person.Person('oldman',
+                                               x, y, direction),
+                       'bluedressgirl': person.Person('femalevillager',
+                                                      x, y, direction,
+                                                      'resting', 1),
+                       'femalewarrior': person.Person('femvillager2',
+                                                      x, y, direction,
+                                                      'autoresting'),
+                       'devil': person.Person('devil', x, y,
+                                              'down', 'autoresting'),
+                       'oldmanbrother': person.Person('oldmanbrother',
+                                                      x, y, direction),
+                       'soldier': person.Person('soldier',
+                                                x, y, direction,
+                                                'resting', index),
+                       'king': person.Person('king', x, y, direction),
+                       'evilwizard': person.Person('evilwizard', x, y, direction),
+                       'treasurechest': person.Chest(x, y, id)}
+
+        sprite = sprite_dict[properties['type']]
+        sprite.properties = properties
+        if sprite_state:
+            sprite.state = sprite_state
+        if 'behavior' in properties:
+            sprite.set_behavior(properties['behavior'],
+                                self.player, self.pathfinder)
+
+        return sprite
+
+    def refresh_sprite(self, sprite):
+        """
+        Give a sprite the item, battle and dialogue that the game data
+        calls for.
+        """
+        properties = sprite.properties
+
+        if 'item' in properties:
+            item = properties['item']
+        else:
+            item = None
+
+        if 'battle' in properties:
+            battle = properties['battle']
+        else:
+            battle = None
+
+        if sprite.name == 'oldman':
+            if self.game_data['old man gift'] and not self.game_data['elixir received']:
+                sprite.item = self.game_data['old man gift']
+            else:
+                sprite.item = item
+        elif sprite.name == 'king':
+            if not self.game_data['talked to king']:
+                sprite.item = self.game_data['king item']
+        else:
+            sprite.item = item
+        sprite.battle = battle
+        self.assign_dialogue(sprite, properties)
+        self.check_for_opened_chest(sprite)
+
+    def is_sprite_shown(self, sprite):
+        """
+        Return False for sprites the game data has taken out of the
+        level, like the evil wizard once he has been beaten.
+        """
+        return not (sprite.name == 'evilwizard' and self.game_data['crown quest'])
+
+    def refresh_sprites(self):
+        """
+        Bring the level's sprites up to date with game data a battle
+        may have changed, and take out any that should be gone.  Sprites
+        left out when the level started are not brought back, since no
+        game data makes a sprite appear.
+        """
+        self.reset_dialogue = ()
+
+        for sprite in self.sprites.sprites():
+            self.refresh_sprite(sprite)
+            if not self.is_sprite_shown(sprite):
+                self.sprites.remove(sprite)
+                self.draw_list.remove(sprite)
+                self.collision_handler.remove_sprite(sprite)
+
+    def make_draw_list(self):
+        """
+        Make the depth sorted list of the player and level sprites.
+        """
+        return drawlist.DrawList([self.player] + self.sprites.sprites())
+
+    def make_lighting(self):
+        """
+        Light dark levels with the player's torch and the map's light
+        objects.  Other levels get no lighting.
+        """
+        if self.name not in c.DARK_LEVELS:
+            return None
+
+        sources = [(self.player, c.PLAYER_LIGHT_RADIUS)]
+        for properties in self.get_object_properties():
+            if properties['name'] == 'light':
+                x, y = self.get_object_tiles(properties)[0]
+                if 'radius' in properties:
+                    radius = int(properties['radius']) * 2
                 else:
-                    sprites.add(sprite)
+                    radius = c.LIGHT_RADIUS
+                sources.append((lighting.Light(x * 32, y * 32), radius))
 
-        return sprites
+        return lighting.Lighting(self.viewport.size, sources)
 
     def assign_dialogue(self, sprite, property_dict):
         """
@@ -323,8 +449,7 @@ class LevelState(tools._State):
         """
         portal_group = pg.sprite.Group()
 
-        for object in self.renderer.tmx_data.getObjects():
-            properties = object.__dict__
+        for properties in self.get_object_properties():
             if properties['name'] == 'portal':
                 posx = properties['x'] * 2
                 posy = (properties['y'] * 2) - 32
@@ -334,14 +459,79 @@ class LevelState(tools._State):
 
         return portal_group
 
+    def prefetch_portal_maps(self):
+        """
+        Start parsing the maps of the levels the portals lead to.
+        """
+        portal_names = [portal.name for portal in self.portals]
+        mapcache.CACHE.prefetch(self.get_portal_maps(portal_names))
+
+    def get_portal_maps(self, names):
+        """
+        Return the TMX files of the levels among names.
+        """
+        return [setup.TMX[name] for name in sorted(set(names))
+                if name in setup.TMX]
+
+    def make_trigger_map(self, portals=None):
+        """
+        Make the tile index of portals, encounter zones and events.
+        Portals default to the level's own.  Every event needs at least
+        one line of dialogue, since its item or battle is given when the
+        dialogue ends.
+        """
+        trigger_map = triggers.TriggerMap()
+        if portals is None:
+            portals = self.portals
+
+        for portal in portals:
+            tile = portal.rect.x // 32, portal.rect.y // 32
+            trigger_map.add([tile], triggers.Trigger('portal', portal.name))
+
+        for properties in self.get_object_properties():
+            if properties['name'] == 'encounter zone':
+                trigger = triggers.Trigger('encounter zone',
+                                           properties['type'],
+                                           properties)
+                trigger_map.add(self.get_object_tiles(properties), trigger)
+            elif properties['name'] == 'event':
+                if not int(properties.get('dialogue length', 0)):
+                    raise ValueError('Event {0} at ({1}, {2}) in {3} has no dialogue'.format(
+                        properties['type'], properties['x'], properties['y'],
+                        self.renderer.filename))
+                trigger = triggers.Trigger('event', properties['type'],
+                                           properties)
+                self.assign_dialogue(trigger, properties)
+                trigger_map.add(self.get_object_tiles(properties), trigger)
+
+        return trigger_map
+
+    def get_object_tiles(self, properties):
+        """
+        Return the tiles covered by a tmx object.  Tile objects sit on
+        a single tile above their anchor point; other objects cover the
+        tiles inside their rect.
+        """
+        x = properties['x'] // 16
+        y = properties['y'] // 16
+
+        if properties['gid']:
+            return [(x, y - 1)]
+
+        width = max((properties['width'] + 15) // 16, 1)
+        height = max((properties['height'] + 15) // 16, 1)
+
+        return list(product(range(x, x + width), range(y, y + height)))
+
     def running_normally(self, surface, keys, current_time):
         """
         Update level normally.
         """
         self.check_for_dialogue()
         self.player.update(keys, current_time)
-        self.sprites.update(current_time)
+        self.update_sprites(current_time)
         self.collision_handler.update(keys, current_time)
+        self.prepare_battle()
         self.check_for_battle()
         self.check_for_portals()
         self.check_for_end_of_game()
@@ -350,6 +540,20 @@ class LevelState(tools._State):
         self.viewport_update()
         self.draw_level(surface)
 
+    def update_sprites(self, current_time):
+        """
+        Fully update sprites near the viewport.  Sprites further away
+        only get a coarse tick that keeps them wandering.
+        """
+        margin = c.UPDATE_MARGIN * 2
+        active_rect = self.viewport.inflate(margin, margin)
+
+        for sprite in self.sprites:
+            if active_rect.colliderect(sprite.rect):
+                sprite.update(current_time)
+            else:
+                sprite.coarse_update(current_time)
+
     def check_for_portals(self):
         """
         Check if the player walks into a door, requiring a level change.
@@ -358,8 +562,16 @@ class LevelState(tools._State):
             self.player.location = self.player.get_tile_location()
             self.update_game_data()
             self.next = self.portal
+            mapcache.CACHE.prefetch(self.get_portal_maps([self.portal]))
             self.state = 'transition_out'
 
+    def prepare_battle(self):
+        """
+        Build part of the next random battle if one is close.
+        """
+        if self.allow_battles and not self.switch_to_battle:
+            battle.PREPARER.update(self.game_data, self.name)
+
     def check_for_battle(self):
         """
         Check if the flag has been made true, indicating
@@ -369,6 +581,7 @@ class LevelState(tools._State):
             self.player.location = self.player.get_tile_location()
             self.update_game_data()
             self.next = 'battle'
+            self.suspend = True
             self.state = 'transition_out'
 
     def check_for_menu(self, keys):
@@ -405,7 +618,7 @@ class LevelState(tools._State):
         """
         Set new start position based on previous state.
         """
-        location = copy.deepcopy(self.game_data['last location'])
+        location = list(self.game_data['last location'])
         direction = self.game_data['last direction']
 
         if self.next == 'player menu':
@@ -482,6 +695,7 @@ class LevelState(tools._State):
         if self.transition_alpha <= 0:
             self.state = 'normal'
             self.transition_alpha = 0
+            self.prefetch_portal_maps()
 
     def update(self, surface, keys, current_time):
         """
@@ -497,16 +711,19 @@ class LevelState(tools._State):
         """
         self.viewport.center = self.player.rect.center
         self.viewport.clamp_ip(self.level_rect)
+        if c.NATIVE_RESOLUTION:
+            self.viewport.x -= self.viewport.x % 2
+            self.viewport.y -= self.viewport.y % 2
 
     def draw_level(self, surface):
         """
         Blit all images to screen.
         """
-        self.level_surface.blit(self.map_image, self.viewport, self.viewport)
-        self.level_surface.blit(self.player.image, self.player.rect)
-        self.sprites.draw(self.level_surface)
-
-        surface.blit(self.level_surface, (0, 0), self.viewport)
+        self.compositor.draw(surface, self.viewport)
+        if c.MINIMAP_HUD:
+            self.minimap.draw(surface, pg.Rect(c.MINIMAP_HUD_RECT),
+                              c.MINIMAP_HUD_SCALE, self.player,
+                              self.draw_list.index)
         self.dialogue_handler.draw(surface)
 
 
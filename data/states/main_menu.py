@@ -1,6 +1,6 @@
 import pickle, sys, os
 import pygame as pg
-from .. import setup, tools, tilerender
+from .. import setup, tools, mapcache
 from .. import observer
 from .. import constants as c
 import death
@@ -24,8 +24,8 @@ class Menu(tools._State):
         self.startup(0, 0)
     
     def startup(self, *args):
-        self.renderer = tilerender.Renderer(self.tmx_map)
-        self.map_image = self.renderer.make_2x_map()
+        self.renderer = mapcache.CACHE.get_renderer(self.tmx_map)
+        self.map_image = mapcache.CACHE.get_map_image(self.tmx_map)
         self.map_rect = self.map_image.get_rect()
         self.viewport = self.make_viewport(self.map_image)
         self.level_surface = pg.Surface(self.map_rect.size)
@@ -113,8 +113,8 @@ class Instructions(tools._State):
         self.music_title = None
         
     def startup(self, *args):
-        self.renderer = tilerender.Renderer(self.tmx_map)
-        self.map_image = self.renderer.make_2x_map()
+        self.renderer = mapcache.CACHE.get_renderer(self.tmx_map)
+        self.map_image = mapcache.CACHE.get_map_image(self.tmx_map)
         self.map_rect = self.map_image.get_rect()
         self.viewport = self.make_viewport(self.map_image)
         self.level_surface = pg.Surface(self.map_rect.size)
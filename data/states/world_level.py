@@ -0,0 +1,222 @@
+"""
+A level stitched together from the maps of a Tiled .world layout.
+The player and every sprite use world coordinates.  Maps near the
+viewport are parsed in the background and loaded one per frame, and
+maps far away are unloaded, so walking between them never fades or
+pauses.
+"""
+import os
+import numpy as np
+import pygame as pg
+from .. import collision, mapcache, minimap, setup, world
+from .. import constants as c
+from . import levels
+
+
+class WorldLevel(levels.LevelState):
+    """
+    Level made of the regions of a world layout.
+    """
+    def __init__(self, name, battles=False):
+        super(WorldLevel, self).__init__(name, battles)
+        self.regions = world.load_layout(setup.WORLDS[name])
+        self.region = None
+        self.prefetch_files = None
+
+    def startup(self, current_time, game_data):
+        """
+        Start the level with the maps in view loaded.  The level's own
+        map holds the start points.
+        """
+        for region in self.regions:
+            region.reset()
+        self.region = self.get_home_region()
+        self.prefetch_files = None
+
+        super(WorldLevel, self).startup(current_time, game_data)
+
+        levels.LevelState.viewport_update(self)
+        for region in self.regions:
+            if region.rect.colliderect(self.viewport):
+                self.load_region(region)
+
+    def get_home_region(self):
+        """
+        Return the region of the level's own map.
+        """
+        path = os.path.abspath(self.tmx_map)
+        for region in self.regions:
+            if os.path.abspath(region.filename) == path:
+                return region
+
+        return self.regions[0]
+
+    def get_object_properties(self):
+        """
+        Return the current region's object properties moved into world
+        coordinates.
+        """
+        offset_x, offset_y = self.region.map_offset
+        properties_list = super(WorldLevel, self).get_object_properties()
+
+        return [dict(properties, x=properties['x'] + offset_x,
+                     y=properties['y'] + offset_y)
+                for properties in properties_list]
+
+    def make_tile_map(self):
+        """
+        Make the map that draws the loaded regions.
+        """
+        scale = 1 if c.NATIVE_RESOLUTION else 2
+        return world.StreamedMap(self.regions, scale)
+
+    def make_map_rect(self):
+        """
+        Make the rect of the whole world.
+        """
+        return self.regions[0].rect.unionall([region.rect for region in self.regions])
+
+    def make_level_portals(self):
+        """
+        Portals are added as regions load.
+        """
+        return pg.sprite.Group()
+
+    def make_blockers(self):
+        """
+        Blockers are added as regions load.
+        """
+        return []
+
+    def make_grid(self):
+        """
+        Make a grid for the whole world.  Tiles stay blocked until
+        their region loads.
+        """
+        grid = collision.TileGrid(self.map_rect.right // 32,
+                                  self.map_rect.bottom // 32, [])
+        grid.blocked[:] = 1
+        return grid
+
+    def make_minimap(self):
+        """
+        Make a blank minimap of the whole world.  Regions are added to
+        it as they load and stay on it after they unload.
+        """
+        image = pg.Surface((self.grid.width, self.grid.height)).convert()
+        image.fill(c.BLACK)
+        return minimap.Minimap(image)
+
+    def make_sprites(self):
+        """
+        Sprites are added as regions load.
+        """
+        return pg.sprite.Group()
+
+    def make_trigger_map(self, portals=None):
+        """
+        Make the trigger map that looks in each region's own.
+        """
+        return world.WorldTriggerMap(self.regions)
+
+    def prefetch_portal_maps(self):
+        """
+        Portal destinations are prefetched along with nearby regions.
+        """
+        self.prefetch_files = None
+
+    def viewport_update(self):
+        """
+        Move the viewport and stream regions around it.
+        """
+        super(WorldLevel, self).viewport_update()
+        self.stream_regions()
+
+    def stream_regions(self):
+        """
+        Unload regions far from the viewport, load the first unloaded
+        region near it and prefetch the ones a little further out.
+        """
+        load_rect = self.viewport.inflate(c.WORLD_LOAD_MARGIN * 2,
+                                          c.WORLD_LOAD_MARGIN * 2)
+        prefetch_rect = self.viewport.inflate(c.WORLD_PREFETCH_MARGIN * 2,
+                                              c.WORLD_PREFETCH_MARGIN * 2)
+        unload_rect = self.viewport.inflate(c.WORLD_UNLOAD_MARGIN * 2,
+                                            c.WORLD_UNLOAD_MARGIN * 2)
+        next_region = None
+        prefetch_files = []
+
+        for region in self.regions:
+            if region.loaded:
+                if not unload_rect.colliderect(region.rect):
+                    self.unload_region(region)
+            elif prefetch_rect.colliderect(region.rect):
+                prefetch_files.append(region.filename)
+                if load_rect.colliderect(region.rect):
+                    next_region = next_region or region
+
+        portal_names = [portal.name for portal in self.portals]
+        prefetch_files.extend(self.get_portal_maps(portal_names))
+        if prefetch_files != self.prefetch_files:
+            mapcache.CACHE.prefetch(prefetch_files)
+            self.prefetch_files = prefetch_files
+
+        if next_region:
+            self.load_region(next_region)
+
+    def load_region(self, region):
+        """
+        Load a region's map, blockers, minimap, portals, triggers and
+        sprites into the level.
+        """
+        self.region = region
+        self.renderer = region.renderer = mapcache.CACHE.get_renderer(region.filename)
+        tmx_data = self.renderer.tmx_data
+        if (tmx_data.width, tmx_data.height) != region.tile_rect.size:
+            raise ValueError('{0} is {1}x{2} tiles, its layout says {3}x{4}'.format(
+                region.filename, tmx_data.width, tmx_data.height,
+                region.tile_rect.width, region.tile_rect.height))
+        region.tile_map = mapcache.CACHE.get_chunked_map(region.filename)
+
+        local_blockers = levels.LevelState.make_blockers(self)
+        local_grid = collision.TileGrid(tmx_data.width, tmx_data.height,
+                                        local_blockers)
+        self.grid.set_area(region.tile_rect.x, region.tile_rect.y,
+                           local_grid.blocked)
+        self.minimap.add(mapcache.CACHE.get_minimap(region.filename,
+                                                    local_grid.blocked),
+                         region.tile_rect.topleft)
+        region.blockers = [blocker.move(region.rect.topleft)
+                           for blocker in local_blockers]
+        self.blockers.extend(region.blockers)
+
+        region.portals = levels.LevelState.make_level_portals(self)
+        self.portals.add(region.portals)
+        region.trigger_map = levels.LevelState.make_trigger_map(self,
+                                                                region.portals)
+
+        region.sprites = levels.LevelState.make_sprites(self)
+        for sprite in region.sprites:
+            self.sprites.add(sprite)
+            self.draw_list.add(sprite)
+            self.collision_handler.add_sprite(sprite)
+
+        region.loaded = True
+
+    def unload_region(self, region):
+        """
+        Take a region's sprites, portals and blockers out of the level
+        and drop its rendered chunks.
+        """
+        for sprite in region.sprites:
+            self.sprites.remove(sprite)
+            self.draw_list.remove(sprite)
+            self.collision_handler.remove_sprite(sprite)
+
+        self.portals.remove(region.portals)
+        self.blockers = [blocker for blocker in self.blockers
+                         if blocker not in region.blockers]
+        self.grid.set_area(region.tile_rect.x, region.tile_rect.y,
+                           np.ones(region.tile_rect.size, np.uint8))
+        region.tile_map.clear()
+        region.reset()
@@ -1,35 +1,121 @@
 """
 This is a test of using the pytmx library with Tiled.
 """
+from itertools import product
 import pygame as pg
 
 from . import pytmx
+from . import constants as c
 
 
 class Renderer(object):
     """
     This object renders tile maps from Tiled
     """
-    def __init__(self, filename):
-        tm = pytmx.load_pygame(filename, pixelalpha=True)
+    def __init__(self, filename, tmx_data=None, tileset_images=None):
+        tm = pytmx.load_pygame(filename, pixelalpha=True, tmxdata=tmx_data,
+                               tileset_images=tileset_images or {})
+        self.filename = filename
         self.size = tm.width * tm.tilewidth, tm.height * tm.tileheight
         self.tmx_data = tm
+        self.animation_length_dict = self.make_animation_length_dict()
+        self.animation_dict = self.make_animation_dict()
 
-    def render(self, surface):
+    def make_animation_length_dict(self):
+        """
+        Make a dictionary of the total duration of each animated tile,
+        keyed by gid.
+        """
+        length_dict = {}
+        for gid, frames in self.tmx_data.tile_animations.items():
+            length_dict[gid] = sum(duration for frame_gid, duration in frames)
 
+        return length_dict
+
+    def make_animation_dict(self):
+        """
+        Index the tiles that hold an animated tile on any visible layer.
+        Each maps to the stacks of layer gids on it and on its neighbors,
+        since scaling up a tile depends on the pixels around it.
+        """
+        animation_dict = {}
+        if not self.tmx_data.tile_animations:
+            return animation_dict
+
+        layers = [layer for layer in self.tmx_data.visibleLayers
+                  if isinstance(layer, pytmx.TiledLayer)]
+        width = self.tmx_data.width
+        height = self.tmx_data.height
+
+        for layer in layers:
+            for x, y, gid in layer:
+                if gid in self.animation_length_dict:
+                    neighbors = []
+                    for dx, dy in product((-1, 0, 1), (-1, 0, 1)):
+                        if 0 <= x + dx < width and 0 <= y + dy < height:
+                            stack = tuple(l.data[y + dy][x + dx] for l in layers)
+                            neighbors.append((dx, dy, stack))
+                    animation_dict[(x, y)] = tuple(neighbors)
+
+        return animation_dict
+
+    def get_frame_gid(self, gid, current_time):
+        """
+        Return the gid of the frame an animated tile shows at
+        current_time, or gid itself if it isn't animated.
+        """
+        length = self.animation_length_dict.get(gid)
+        if not length:
+            return gid
+
+        time = current_time % length
+        for frame_gid, duration in self.tmx_data.tile_animations[gid]:
+            if time < duration:
+                return frame_gid
+            time -= duration
+
+        return gid
+
+    def render_stack(self, surface, gids):
+        """
+        Render one tile's stack of layer gids onto surface.
+        """
+        gt = self.tmx_data.getTileImageByGid
+
+        if self.tmx_data.background_color:
+            surface.fill(self.tmx_data.background_color)
+
+        for gid in gids:
+            tile = gt(gid)
+            if tile:
+                surface.blit(tile, (0, 0))
+
+    def render(self, surface, area=None):
+        """
+        Render the map onto surface.  If area, a rect in tiles, is
+        given only those tiles are rendered, with the top left of the
+        area at the top left of surface.
+        """
         tw = self.tmx_data.tilewidth
         th = self.tmx_data.tileheight
         gt = self.tmx_data.getTileImageByGid
 
+        if area is None:
+            area = pg.Rect(0, 0, self.tmx_data.width, self.tmx_data.height)
+        tiles = area.clip(pg.Rect(0, 0, self.tmx_data.width, self.tmx_data.height))
+
         if self.tmx_data.background_color:
             surface.fill(self.tmx_data.background_color)
 
         for layer in self.tmx_data.visibleLayers:
             if isinstance(layer, pytmx.TiledLayer):
-                for x, y, gid in layer:
-                    tile = gt(gid)
-                    if tile:
-                        surface.blit(tile, (x * tw, y * th))
+                for y in range(tiles.top, tiles.bottom):
+                    row = layer.data[y]
+                    for x in range(tiles.left, tiles.right):
+                        tile = gt(row[x])
+                        if tile:
+                            surface.blit(tile, ((x - area.x) * tw,
+                                                (y - area.y) * th))
 
             elif isinstance(layer, pytmx.TiledObjectGroup):
                 pass
@@ -37,10 +123,200 @@ class Renderer(object):
             elif isinstance(layer, pytmx.TiledImageLayer):
                 image = gt(layer.gid)
                 if image:
-                    surface.blit(image, (0, 0))
+                    surface.blit(image, (-area.x * tw, -area.y * th))
 
     def make_2x_map(self):
         temp_surface = pg.Surface(self.size)
         self.render(temp_surface)
         temp_surface = pg.transform.scale2x(temp_surface)
-        return temp_surface
\ No newline at end of file
+        return temp_surface
+
+
+class ChunkedMap(object):
+    """
+    A map image, at 2x or native scale, split into square chunks.  A
+    chunk is rendered the first time it is drawn and dropped again once
+    it is far from the area being drawn, so only the chunks around the
+    viewport are held.
+    """
+    def __init__(self, renderer, chunk_tiles=c.MAP_CHUNK_TILES, scale=2):
+        self.renderer = renderer
+        self.chunk_tiles = chunk_tiles
+        self.scale = scale
+        self.chunk_size = chunk_tiles * renderer.tmx_data.tilewidth * scale
+        self.size = renderer.size[0] * scale, renderer.size[1] * scale
+        self.chunk_dict = {}
+        self.animation_dict = self.make_animation_dict()
+        self.frame_dict = {}
+
+    def make_animation_dict(self):
+        """
+        Bucket the renderer's animated tiles by the chunk they are in.
+        A native scale map only needs the stack on the tile itself.
+        """
+        animation_dict = {}
+        for (x, y), neighbors in self.renderer.animation_dict.items():
+            if self.scale == 1:
+                neighbors = [n for n in neighbors if n[:2] == (0, 0)]
+            chunk = x // self.chunk_tiles, y // self.chunk_tiles
+            animation_dict.setdefault(chunk, []).append((x, y, neighbors))
+
+        return animation_dict
+
+    def get_rect(self):
+        """
+        Return the rect of the whole map.
+        """
+        return pg.Rect((0, 0), self.size)
+
+    def get_chunk(self, chunk):
+        """
+        Return the surface for a chunk, rendering it if needed.
+        """
+        if chunk not in self.chunk_dict:
+            self.chunk_dict[chunk] = self.make_chunk(chunk)
+        return self.chunk_dict[chunk]
+
+    def make_chunk(self, chunk):
+        """
+        Render a chunk at 1x and, for a 2x map, scale it up.  A one
+        tile border is rendered around a 2x chunk and cut off after
+        scaling, so the edges scale the same as they would in one whole
+        map image.
+        """
+        tile_size = self.renderer.tmx_data.tilewidth
+        map_area = pg.Rect(0, 0, self.renderer.tmx_data.width,
+                           self.renderer.tmx_data.height)
+        area = pg.Rect(chunk[0] * self.chunk_tiles, chunk[1] * self.chunk_tiles,
+                       self.chunk_tiles, self.chunk_tiles).clip(map_area)
+
+        if self.scale == 1:
+            chunk_surface = pg.Surface((area.width * tile_size,
+                                        area.height * tile_size)).convert()
+            self.renderer.render(chunk_surface, area)
+            return chunk_surface
+
+        padded = area.inflate(2, 2).clip(map_area)
+
+        temp_surface = pg.Surface((padded.width * tile_size,
+                                   padded.height * tile_size)).convert()
+        self.renderer.render(temp_surface, padded)
+        temp_surface = pg.transform.scale2x(temp_surface)
+
+        scale = tile_size * 2
+        chunk_rect = pg.Rect((area.x - padded.x) * scale,
+                             (area.y - padded.y) * scale,
+                             area.width * scale, area.height * scale)
+
+        return temp_surface.subsurface(chunk_rect).copy()
+
+    def get_chunks(self, rect):
+        """
+        Return the chunks, as (column, row) tuples, that rect overlaps.
+        """
+        size = self.chunk_size
+        rect = rect.clip(pg.Rect((0, 0), self.size))
+        if not rect.width or not rect.height:
+            return []
+        columns = range(rect.left // size, (rect.right + size - 1) // size)
+        rows = range(rect.top // size, (rect.bottom + size - 1) // size)
+
+        return [(column, row) for row in rows for column in columns]
+
+    def draw(self, surface, area, dest=None, current_time=0):
+        """
+        Draw the part of the map inside area onto surface, with the top
+        left of area at dest (area's own top left by default).  Animated
+        tiles are drawn over the chunks with their frame at current_time.
+        Chunks far from area are dropped.
+        """
+        if dest is None:
+            dest = area.topleft
+        offset_x = dest[0] - area.x
+        offset_y = dest[1] - area.y
+        size = self.chunk_size
+
+        for column, row in self.get_chunks(area):
+            chunk_rect = pg.Rect(column * size, row * size, size, size)
+            chunk_rect = chunk_rect.clip(self.get_rect())
+            clip_rect = chunk_rect.clip(area)
+            surface.blit(self.get_chunk((column, row)),
+                         (clip_rect.x + offset_x, clip_rect.y + offset_y),
+                         clip_rect.move(-chunk_rect.x, -chunk_rect.y))
+
+            if (column, row) in self.animation_dict:
+                self.draw_animated_tiles(surface, area, (offset_x, offset_y),
+                                         (column, row), current_time)
+
+        self.evict(area)
+
+    def draw_animated_tiles(self, surface, area, offset, chunk, current_time):
+        """
+        Redraw the animated tiles of a chunk that are inside area.
+        """
+        get_frame_gid = self.renderer.get_frame_gid
+        tile_size = self.renderer.tmx_data.tilewidth * self.scale
+
+        for x, y, neighbors in self.animation_dict[chunk]:
+            tile_rect = pg.Rect(x * tile_size, y * tile_size, tile_size, tile_size)
+            clip_rect = tile_rect.clip(area)
+            if clip_rect.width and clip_rect.height:
+                frames = tuple((dx, dy, tuple([get_frame_gid(gid, current_time)
+                                               for gid in stack]))
+                               for dx, dy, stack in neighbors)
+                surface.blit(self.get_frame(frames),
+                             (clip_rect.x + offset[0], clip_rect.y + offset[1]),
+                             clip_rect.move(-tile_rect.x, -tile_rect.y))
+
+    def get_frame(self, frames):
+        """
+        Return the image of an animated tile at the map's scale, given
+        the stacks of frame gids on it and, for a 2x map, around it.
+        Every tile showing the same frames shares one image.
+        """
+        if frames not in self.frame_dict:
+            tile_size = self.renderer.tmx_data.tilewidth
+            left = min(dx for dx, dy, stack in frames)
+            top = min(dy for dx, dy, stack in frames)
+            columns = max(dx for dx, dy, stack in frames) - left + 1
+            rows = max(dy for dx, dy, stack in frames) - top + 1
+
+            frame = pg.Surface((columns * tile_size, rows * tile_size)).convert()
+            tile = pg.Surface((tile_size, tile_size)).convert()
+            for dx, dy, stack in frames:
+                self.renderer.render_stack(tile, stack)
+                frame.blit(tile, ((dx - left) * tile_size, (dy - top) * tile_size))
+
+            if self.scale == 2:
+                frame = pg.transform.scale2x(frame)
+            scaled_size = tile_size * self.scale
+            frame_rect = pg.Rect(-left * scaled_size, -top * scaled_size,
+                                 scaled_size, scaled_size)
+            self.frame_dict[frames] = frame.subsurface(frame_rect).copy()
+
+        return self.frame_dict[frames]
+
+    def evict(self, area):
+        """
+        Drop chunks further than MAP_CHUNK_MARGIN pixels from area.
+        """
+        margin = c.MAP_CHUNK_MARGIN * 2
+        keep = set(self.get_chunks(area.inflate(margin, margin)))
+
+        for chunk in list(self.chunk_dict):
+            if chunk not in keep:
+                del self.chunk_dict[chunk]
+
+    def clear(self):
+        """
+        Drop every rendered chunk and animation frame.
+        """
+        self.chunk_dict.clear()
+        self.frame_dict.clear()
+
+    def get_byte_size(self):
+        """
+        Return the number of bytes of chunk images held.
+        """
+        return sum(chunk.get_width() * chunk.get_height() * chunk.get_bytesize()
+                   for chunk in self.chunk_dict.values())
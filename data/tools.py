@@ -2,6 +2,7 @@ __author__ = 'justinarmstrong'
 
 import os, random
 import pygame as pg
+from . import clock
 from . import constants as c
 
 class Control(object):
@@ -22,6 +23,7 @@ class Control(object):
         self.state_dict = {}
         self.state_name = None
         self.state = None
+        self.state_stack = []
 
     def setup_states(self, state_dict, start_state):
         self.state_dict = state_dict
@@ -31,6 +33,7 @@ class Control(object):
 
     def update(self):
         self.current_time = pg.time.get_ticks()
+        clock.CLOCK.update(self.current_time)
         if self.state.quit:
             self.done = True
         elif self.state.done:
@@ -38,13 +41,31 @@ class Control(object):
         self.state.update(self.screen, self.keys, self.current_time)
 
     def flip_state(self):
+        """
+        Switch to the next state.  A state that set its suspend flag is
+        pushed on the state stack and is resumed, rather than started up
+        again, when it is flipped back to.  Flipping anywhere else
+        discards the suspended states.
+        """
         previous, self.state_name = self.state_name, self.state.next
         previous_music = self.state.music_title
+        suspended = self.state.suspend
+        self.state.suspend = False
         persist = self.state.cleanup()
         self.state = self.state_dict[self.state_name]
         self.state.previous = previous
         self.state.previous_music = previous_music
-        self.state.startup(self.current_time, persist)
+
+        if self.state_stack and self.state_stack[-1] == self.state_name:
+            self.state_stack.pop()
+            self.state.resume(self.current_time, persist)
+        else:
+            if not suspended:
+                del self.state_stack[:]
+            self.state.startup(self.current_time, persist)
+
+        if suspended:
+            self.state_stack.append(previous)
         self.set_music()
 
     def set_music(self):
@@ -98,6 +119,7 @@ class _State(object):
         self.current_time = 0.0
         self.done = False
         self.quit = False
+        self.suspend = False
         self.next = None
         self.previous = None
         self.game_data = {}
@@ -112,6 +134,13 @@ class _State(object):
         self.game_data = game_data
         self.start_time = current_time
 
+    def resume(self, current_time, game_data):
+        """
+        Called instead of startup when a suspended state is flipped
+        back to.  States that keep their resources override this.
+        """
+        self.startup(current_time, game_data)
+
     def cleanup(self):
         self.done = False
         return self.game_data
@@ -152,6 +181,10 @@ def load_all_tmx(directory, accept=('.tmx')):
     return load_all_music(directory, accept)
 
 
+def load_all_worlds(directory, accept=('.world',)):
+    return load_all_music(directory, accept)
+
+
 def load_all_sfx(directory, accept=('.wav','.mp3','.ogg','.mdi')):
     effects = {}
     for fx in os.listdir(directory):
@@ -0,0 +1,45 @@
+"""
+Tile indexed triggers for levels.  Portals, encounter zones and
+scripted events are read from the TMX map once when the level loads,
+so finding what the player stepped on is a single lookup no matter
+how many triggers a map has.
+"""
+from . import constants as c
+
+
+class Trigger(object):
+    """
+    Something that happens when the player steps onto a tile.  Event
+    triggers have dialogue, and may have an item or battle, so the
+    TextHandler can treat them like a talking sprite.  Encounter zones
+    without a rate use the normal ENCOUNTER_RATE.
+    """
+    def __init__(self, kind, name, properties=None):
+        properties = properties or {}
+        self.kind = kind
+        self.name = name
+        self.rate = int(properties.get('rate', c.ENCOUNTER_RATE))
+        self.dialogue = []
+        self.item = properties.get('item')
+        self.battle = properties.get('battle')
+
+
+class TriggerMap(object):
+    """
+    Triggers keyed by tile coordinates.
+    """
+    def __init__(self):
+        self.tile_dict = {}
+
+    def add(self, tiles, trigger):
+        """
+        Add a trigger to every tile in tiles.
+        """
+        for tile in tiles:
+            self.tile_dict.setdefault(tile, []).append(trigger)
+
+    def get_triggers(self, tile):
+        """
+        Return the triggers on a tile.
+        """
+        return self.tile_dict.get(tile, ())
@@ -0,0 +1,66 @@
+"""
+Enemy variants made by palette swapping existing sprite sheets.
+Each variant is a base sheet, a small colour lookup table and stat
+overrides, so new enemy types cost no extra image files on disk.
+"""
+import numpy as np
+import pygame as pg
+
+
+def make_variant_dict():
+    """
+    Make a dictionary of enemy variants keyed by name.
+    """
+    variant_dict = {'frost devil': {'sheet': 'devil',
+                                    'palette': {(255, 112, 112): (170, 210, 255),
+                                                (255, 0, 0): (60, 140, 255),
+                                                (196, 0, 0): (30, 90, 210),
+                                                (112, 0, 0): (10, 40, 120)},
+                                    'level bonus': 1,
+                                    'health bonus': 0},
+                    'swamp devil': {'sheet': 'devil',
+                                    'palette': {(255, 112, 112): (150, 230, 120),
+                                                (255, 0, 0): (40, 170, 40),
+                                                (196, 0, 0): (20, 120, 30),
+                                                (112, 0, 0): (10, 60, 15)},
+                                    'level bonus': 0,
+                                    'health bonus': 2},
+                    'shadow devil': {'sheet': 'devil',
+                                     'palette': {(255, 255, 0): (255, 60, 60),
+                                                 (255, 112, 112): (200, 150, 230),
+                                                 (255, 0, 0): (130, 40, 190),
+                                                 (196, 0, 0): (90, 20, 140),
+                                                 (112, 0, 0): (45, 5, 75)},
+                                     'level bonus': 2,
+                                     'health bonus': 4}}
+
+    return variant_dict
+
+
+def palette_swap(sheet, palette):
+    """
+    Return a copy of sheet with every colour in palette replaced.
+    """
+    new_sheet = sheet.copy()
+    pixels = pg.surfarray.pixels3d(new_sheet)
+    original = pixels.copy()
+
+    for old_color, new_color in palette.items():
+        mask = np.all(original == old_color, axis=-1)
+        pixels[mask] = new_color
+
+    del pixels
+    return new_sheet
+
+
+def make_variant_sheets(gfx):
+    """
+    Make the sprite sheets for all variants from the loaded graphics.
+    Called once at load time; the result is cached in setup.GFX.
+    """
+    sheets = {}
+
+    for name, variant in make_variant_dict().items():
+        sheets[name] = palette_swap(gfx[variant['sheet']], variant['palette'])
+
+    return sheets
@@ -0,0 +1,107 @@
+"""
+Pieces of a world stitched together from several TMX maps.  The layout
+is a Tiled .world file giving each map's position in TMX pixels, which
+must fall on whole tiles.  Each map becomes a Region of the world that
+a WorldLevel loads and unloads around the player.
+"""
+import os
+import json
+import pygame as pg
+from . import constants as c
+
+
+class Region(object):
+    """
+    One TMX map placed in the world.  rect is in level (2x) pixels.
+    """
+    def __init__(self, filename, x, y, width, height):
+        self.filename = filename
+        self.map_offset = x, y
+        self.rect = pg.Rect(x * 2, y * 2, width * 2, height * 2)
+        self.tile_rect = pg.Rect(x // 16, y // 16, width // 16, height // 16)
+        self.reset()
+
+    def reset(self):
+        """
+        Forget everything loaded for the region.
+        """
+        self.loaded = False
+        self.renderer = None
+        self.tile_map = None
+        self.trigger_map = None
+        self.blockers = []
+        self.portals = pg.sprite.Group()
+        self.sprites = pg.sprite.Group()
+
+
+def load_layout(filename):
+    """
+    Read the regions of a Tiled .world file.  Map paths are relative
+    to the file.
+    """
+    with open(filename) as world_file:
+        layout = json.load(world_file)
+
+    directory = os.path.dirname(filename)
+    return [Region(os.path.join(directory, entry['fileName']),
+                   entry['x'], entry['y'], entry['width'], entry['height'])
+            for entry in layout['maps']]
+
+
+def get_region(regions, tile):
+    """
+    Return the region a tile is in, or None.
+    """
+    for region in regions:
+        if region.tile_rect.collidepoint(tile):
+            return region
+
+
+class StreamedMap(object):
+    """
+    Draws the loaded regions of a world the way a ChunkedMap draws a
+    single map.  Parts of the world not loaded yet are drawn black.
+    """
+    def __init__(self, regions, scale=2):
+        self.regions = regions
+        self.scale = scale
+
+    def draw(self, surface, area, dest=None, current_time=0):
+        """
+        Draw the part of the world inside area onto surface, with the
+        top left of area at dest (area's own top left by default).
+        """
+        if dest is None:
+            dest = area.topleft
+
+        for region in self.regions:
+            rect = pg.Rect([value * self.scale // 2 for value in region.rect])
+            clip_rect = rect.clip(area)
+            if not clip_rect.width or not clip_rect.height:
+                continue
+
+            region_dest = (dest[0] + clip_rect.x - area.x,
+                           dest[1] + clip_rect.y - area.y)
+            if region.loaded:
+                region.tile_map.draw(surface, clip_rect.move(-rect.x, -rect.y),
+                                     region_dest, current_time)
+            else:
+                surface.fill(c.BLACK, pg.Rect(region_dest, clip_rect.size))
+
+
+class WorldTriggerMap(object):
+    """
+    Looks up triggers in the trigger map of the loaded region a tile
+    is in.
+    """
+    def __init__(self, regions):
+        self.regions = regions
+
+    def get_triggers(self, tile):
+        """
+        Return the triggers on a tile.
+        """
+        region = get_region(self.regions, tile)
+        if region and region.loaded:
+            return region.trigger_map.get_triggers(tile)
+        return ()